@@ -1,10 +1,21 @@
 #!/usr/bin/env python
 # pkg(mazunki)/__init__.py
 
-from .pythoning.fmt.clear import clear
-from .pythoning.fmt.printing import print as pprint
-from .pythoning.typed import errors, collections, casting, static
-from .pythoning import xdg
+from .pythoning import lazy
+
+# nothing is imported until it's used, see pythoning.lazy
+__getattr__, __dir__ = lazy.exports(
+    __name__,
+    {
+        "clear": ".pythoning.fmt.clear:clear",
+        "pprint": ".pythoning.fmt.printing:print",
+        "errors": ".pythoning.typed.errors",
+        "collections": ".pythoning.typed.collections",
+        "casting": ".pythoning.typed.casting",
+        "static": ".pythoning.typed.static",
+        "xdg": ".pythoning.xdg",
+    },
+)
 
 __all__ = ("clear", "pprint", "errors", "collections", "casting", "static", "xdg")
 
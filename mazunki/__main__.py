@@ -12,8 +12,11 @@ def main(subproject, *subproject_args, invoke="main"):
         "minecraft": "mazunki.minecraft.__main__",
         "pythoning": "mazunki.pythoning.__main__",
         "format": "mazunki.pythoning.fmt.formatters",
+        "bench": "mazunki.bench.__main__",
     }
-    os.chdir(os.path.dirname(os.path.realpath(__file__)))
+    # bench writes --json files where it was asked to, relative to the caller
+    if subproject != "bench":
+        os.chdir(os.path.dirname(os.path.realpath(__file__)))
 
     if subproject not in subprojects:
         print(f"Unknown subproject: {subproject}")
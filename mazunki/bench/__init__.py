@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+# pkg(mazunki)/bench/__init__.py
+
+from .harness import Result, benchmark, benchmarks, measure, run
+from . import suites
+
+__all__ = ("Result", "benchmark", "benchmarks", "measure", "run")
+
+#  vim: set sw=4 ts=4 expandtab
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# pkg(mazunki)/bench/__main__.py
+import sys
+import json
+import fnmatch
+import argparse
+import platform
+
+from . import benchmarks, run
+from .suites import SEED, STARTUP_BUDGET, import_time
+
+
+def main(*args):
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths")
+    parser.add_argument(
+        "-k", "--select", action="append", help="Only run benchmarks matching this glob"
+    )
+    parser.add_argument(
+        "--scale", type=int, default=1, help="Multiply every input size by this"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="Timed batches per benchmark, for ops/s"
+    )
+    parser.add_argument(
+        "--json", metavar="FILE", help="Also write results as JSON ('-' for stdout)"
+    )
+    parser.add_argument("--list", action="store_true", help="List benchmarks")
+    parser.add_argument(
+        "--startup",
+        action="store_true",
+        help="Check import times against the startup budget, fail if over",
+    )
+    args = parser.parse_args(args)
+
+    if args.startup:
+        over = False
+        for module, budget in STARTUP_BUDGET.items():
+            us = import_time(module)
+            over |= us > budget
+            verdict = "ok" if us <= budget else "OVER"
+            print(f"{module:<30} {us:>8,}µs / {budget:>8,}µs  {verdict}")
+        sys.exit(1 if over else 0)
+
+    names = [
+        name
+        for name in benchmarks
+        if not args.select or any(fnmatch.fnmatch(name, k) for k in args.select)
+    ]
+    if args.list:
+        print(*names, sep="\n")
+        return
+
+    results = []
+    for result in run(names, scale=args.scale, repeat=args.repeat):
+        if args.json != "-":
+            print(result, flush=True)
+        results.append(result)
+
+    if args.json:
+        report = {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "seed": SEED,
+            "scale": args.scale,
+            "repeat": args.repeat,
+            "results": [result.__json__() for result in results],
+        }
+        if args.json == "-":
+            print(json.dumps(report, indent=4))
+        else:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
+
+#  vim: set sw=4 ts=4 expandtab
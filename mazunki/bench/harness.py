@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# pkg(mazunki)/bench/harness.py
+import gc
+import time
+import timeit
+import statistics
+import tracemalloc
+import contextlib
+from dataclasses import dataclass, asdict
+from typing import Callable, ContextManager, Iterator
+
+from ..pythoning.fmt.units import human_bytes
+
+__all__ = ("Result", "benchmark", "benchmarks", "measure", "run")
+
+type Benchmark = Callable[[int], ContextManager[Callable[[], object]]]
+
+benchmarks: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str):
+    # registers a generator taking a scale factor, which sets up its inputs,
+    # yields the callable to time, and cleans up after itself
+    def _register(func):
+        benchmarks[name] = contextlib.contextmanager(func)
+        return func
+
+    return _register
+
+
+@dataclass
+class Result:
+    name: str
+    number: int
+    repeat: int
+    ops_per_sec: float  # from the batches
+    p50: float  # from single calls
+    p99: float
+    peak_bytes: int
+
+    def __json__(self):
+        return asdict(self)
+
+    def __str__(self):
+        return (
+            f"{self.name:<28} {self.ops_per_sec:>14,.1f} ops/s"
+            f"  p50 {_seconds(self.p50):>9}  p99 {_seconds(self.p99):>9}"
+            f"  peak {human_bytes(self.peak_bytes):>9}"
+        )
+
+
+def _seconds(value: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if value >= scale:
+            return f"{value / scale:.2f}{unit}"
+    return f"{value / 1e-9:.0f}ns"
+
+
+def _percentile(samples: list[float], q: int) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+
+def _overhead(count: int = 1000) -> float:
+    # what a perf_counter() pair costs on its own
+    clock = time.perf_counter
+    samples = []
+    for _ in range(count):
+        start = clock()
+        samples.append(clock() - start)
+    return statistics.median(samples)
+
+
+def _calls(func: Callable[[], object], count: int) -> list[float]:
+    # one sample per call, less the timer's own cost. batch means would
+    # average the tail away, so the percentiles come from these instead
+    clock = time.perf_counter
+    overhead = _overhead()
+    samples = []
+    for _ in range(count):
+        start = clock()
+        func()
+        samples.append(max(clock() - start - overhead, 0.0))
+    return samples
+
+
+def measure(
+    name: str, func: Callable[[], object], repeat: int = 20, calls: int = 100_000
+) -> Result:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+
+    # throughput is the mean over `repeat` batches of `number` calls
+    batches = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+
+    # latency is timed call by call, about as many as went into the batches
+    gc.collect()
+    samples = _calls(func, min(number * repeat, calls))
+
+    # allocation tracking slows everything down, so it gets its own run
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(
+        name=name,
+        number=number,
+        repeat=repeat,
+        ops_per_sec=1 / statistics.fmean(batches),
+        p50=_percentile(samples, 50),
+        p99=_percentile(samples, 99),
+        peak_bytes=peak,
+    )
+
+
+def run(names: list[str], *, scale: int = 1, repeat: int = 20) -> Iterator[Result]:
+    for name in names:
+        with benchmarks[name](scale) as func:
+            yield measure(name, func, repeat=repeat)
+
+
+#  vim: set sw=4 ts=4 expandtab
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# pkg(mazunki)/bench/suites.py
+import os
+import sys
+import random
+import itertools
+import tempfile
+import subprocess
+
+from .harness import benchmark
+
+SEED = 0x6D617A
+
+# cumulative microseconds each package may take to import in a fresh
+# interpreter, as reported by -X importtime. everything heavier than the
+# standard library's basics is supposed to load lazily
+STARTUP_BUDGET = {
+    "mazunki": 10_000,
+    "mazunki.chronos": 10_000,
+    "mazunki.maths": 10_000,
+    "mazunki.pythoning.typed": 10_000,
+    "mazunki.pythoning.fmt": 10_000,
+}
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_fake_repos(root: str, repos: int, seed: int = SEED) -> list[str]:
+    # repos scattered at random depths, with plain directories and a few
+    # node_modules trees in between, roughly like a messy home directory
+    rng = random.Random(seed)
+    made = []
+    for n in range(repos):
+        parents = [f"group{rng.randrange(repos // 10 + 1)}"]
+        parents += [f"dir{rng.randrange(4)}" for _ in range(rng.randrange(3))]
+        repo = os.path.join(root, *parents, f"repo{n}")
+
+        os.makedirs(os.path.join(repo, ".git", "refs", "heads"), exist_ok=True)
+        with open(os.path.join(repo, ".git", "HEAD"), "w") as f:
+            f.write("ref: refs/heads/master\n")
+        for sub in ("src", "docs", "tests"):
+            os.makedirs(os.path.join(repo, sub), exist_ok=True)
+
+        if rng.random() < 0.2:
+            vendored = os.path.join(root, *parents, "node_modules")
+            for dep in range(10):
+                os.makedirs(os.path.join(vendored, f"dep{dep}", "lib"), exist_ok=True)
+        made.append(repo)
+    return made
+
+
+def make_time_corpus(size: int, seed: int = SEED) -> list[str]:
+    rng = random.Random(seed)
+    units = ("years", "months", "weeks", "days", "hours", "minutes", "seconds")
+    corpus = []
+    for _ in range(size):
+        if rng.random() < 0.1:
+            corpus.append(rng.choice(("today", "yesterday", "tomorrow")))
+            continue
+        picked = rng.sample(units, rng.randint(1, 3))
+        amounts = " ".join(f"{rng.randint(1, 60)} {unit}" for unit in picked)
+        corpus.append(f"in {amounts}" if rng.random() < 0.5 else f"{amounts} ago")
+    return corpus
+
+
+def make_nesting(depth: int, width: int) -> list:
+    nested = list(range(width))
+    for level in range(depth):
+        nested = [level, nested, list(range(width))]
+    return nested
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    # a fresh interpreter that imports this copy of mazunki
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (_ROOT, env.get("PYTHONPATH"))))
+    return subprocess.run(
+        [sys.executable, *args], env=env, capture_output=True, text=True, check=True
+    )
+
+
+def import_time(module: str, runs: int = 3) -> int:
+    # best of a few runs, in microseconds, including everything it imports
+    best = None
+    for _ in range(runs):
+        stderr = _python("-X", "importtime", "-c", f"import {module}").stderr
+        for line in stderr.splitlines():
+            _, _, fields = line.partition("import time:")
+            _, cumulative, name = fields.split("|")
+            if name.strip() == module:
+                best = min(int(cumulative), best or int(cumulative))
+    return best
+
+
+@benchmark("startup.import")
+def bench_startup(scale):
+    # the whole cold start of a CLI invocation, interpreter included
+    yield lambda: _python("-c", "import mazunki")
+
+
+@benchmark("projects.discovery")
+def bench_discovery(scale):
+    from ..projects import discovery
+
+    with tempfile.TemporaryDirectory(prefix="mazunki-bench-") as root:
+        make_fake_repos(root, repos=200 * scale)
+        yield lambda: sum(1 for _ in discovery.find_repo_roots(root))
+
+
+@benchmark("projects.index")
+def bench_index(scale):
+    from ..projects.index import ProjectIndex
+
+    with tempfile.TemporaryDirectory(prefix="mazunki-bench-") as root:
+        make_fake_repos(os.path.join(root, "tree"), repos=200 * scale)
+        index = ProjectIndex(os.path.join(root, "tree"), directory=root)
+        index.refresh(full=True)
+        # the incremental path: nothing changed, so it's stats all the way down
+        yield lambda: len(index.refresh())
+
+
+@benchmark("chronos.parse")
+def bench_time_parse(scale):
+    from ..chronos.calculate import Time
+    from ..chronos.parsing import parse_units
+
+    # a real parse every time: the corpus repeats, and would otherwise mostly
+    # measure parse_units' cache
+    corpus = itertools.cycle(make_time_corpus(1000 * scale))
+
+    def parse():
+        parse_units.cache_clear()
+        return Time.parse(next(corpus))
+
+    yield parse
+
+
+@benchmark("chronos.parse.cached")
+def bench_time_parse_cached(scale):
+    from ..chronos.calculate import Time
+
+    # expressions seen before, like a long --stdin run keeps getting
+    corpus = itertools.cycle(make_time_corpus(1000 * scale))
+    yield lambda: Time.parse(next(corpus))
+
+
+@benchmark("fmt.formatter")
+def bench_formatter(scale):
+    from ..pythoning.fmt.formatters import Formatter
+
+    formatter = Formatter({"t": "git", "n": "pymazunki", "o": "mazunki", "p": "~/src"})
+    yield lambda: formatter.format("%t:%n\t(%o)\t%p\t{n}")
+
+
+@benchmark("fmt.cells")
+def bench_cells(scale):
+    from ..pythoning.fmt.expressions import cells
+
+    data = range(1, 100 * scale + 1)
+    yield lambda: cells(data, max=10, width=5)
+
+
+@benchmark("typed.flatten")
+def bench_flatten(scale):
+    from ..pythoning.typed.collections import flatten
+
+    nested = make_nesting(depth=100, width=10 * scale)
+    yield lambda: sum(1 for _ in flatten(int, nested))
+
+
+#  vim: set sw=4 ts=4 expandtab
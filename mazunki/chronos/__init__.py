@@ -1,6 +1,17 @@
 #!/usr/bin/env python
 
-from .calculate import Time
-from .idling import calculator
+from ..pythoning import lazy
+
+# TimeArray and the estimator pull in numpy, so only load them when used
+__getattr__, __dir__ = lazy.exports(
+    __name__,
+    {
+        "Time": ".calculate:Time",
+        "TimeArray": ".array:TimeArray",
+        "calculator": ".idling.calculator",
+        "estimator": ".idling.estimator",
+    },
+)
+__all__ = ("Time", "TimeArray", "calculator", "estimator")
 
 #  vim: set sw=4 ts=4 expandtab
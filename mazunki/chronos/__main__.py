@@ -1,24 +1,25 @@
 #!/usr/bin/env python
-from .clock import *
-
+import itertools
+import re
 import sys
 
-_, *args = sys.argv
+from .calculate import Time
+
+recognized_modes = {"add", "subtract"}
 
+# "<expr> [add|subtract <expr>]...", one per line in --stdin mode
+_PIPELINE = re.compile(r"\s+(add|subtract)\s+")
 
-def time_from(times, arg):
+
+def time_from(times, arg, anonymous):
     if arg.startswith("%"):
         tname = arg[1:]
         return times, tname
 
-    anonymous_keys = [
-        tname.partition("t")[2] for tname in times.keys() if tname.startswith("__")
-    ]
-    __last_anon = max(anonymous_keys) if anonymous_keys else 0
     if arg.startswith("--") and "=" in arg:
         tname, _, tfmt = arg[2:].partition("=")
     else:
-        tname, tfmt = f"__t{int(__last_anon)+1}", arg
+        tname, tfmt = f"__t{next(anonymous)}", arg
 
     t = Time.parse(tfmt)
     times[tname] = t
@@ -26,10 +27,9 @@ def time_from(times, arg):
 
 
 def parse_args(args):
-    mode = "print"
     times = {}
     units = []
-    recognized_modes = {"add", "subtract"}
+    anonymous = itertools.count(1)
     mode = None
 
     u = []
@@ -40,7 +40,7 @@ def parse_args(args):
             u = []
             mode = arg
         else:
-            times, time = time_from(times, arg)
+            times, time = time_from(times, arg, anonymous)
             if mode:
                 u.append(time)
 
@@ -49,27 +49,79 @@ def parse_args(args):
     return times, units
 
 
-times, tasks = parse_args(args)
-print(times, tasks, sep="\n")
+def combine(mode, lhs: Time, rhs: Time) -> Time:
+    if mode == "add":
+        return lhs + rhs
+    elif mode == "subtract":
+        return lhs - rhs
+    raise ValueError(f"unknown mode {mode}")
+
+
+def run(times, tasks):
+    results = []
+    for mode, batch in tasks:
+        car, cdr = batch[0], batch[1:]
+
+        b = [times[car]]
+        for name in cdr:
+            b.append(combine(mode, b[-1], times[name]))
+
+        results.append((mode, b))
+    return results
+
+
+def evaluate(line: str, times) -> Time:
+    lookup = lambda expr: times[expr[1:]] if expr.startswith("%") else Time.parse(expr)
+
+    first, *rest = _PIPELINE.split(line)
+    result = lookup(first)
+    for mode, expr in itertools.batched(rest, 2):
+        result = combine(mode, result, lookup(expr))
+    return result
+
+
+def stream(lines, times, out=sys.stdout, err=sys.stderr) -> int:
+    # one result line per expression line, nothing kept around in between.
+    # bad lines are reported on err (with their line number) and skipped
+    failures = 0
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            out.write(f"{evaluate(line, times)}\n")
+        except (ValueError, KeyError) as e:
+            failures += 1
+            err.write(f"{lineno}: {e}\n")
+    return failures
+
+
+def main(*args):
+    if "--stdin" in args:
+        # other arguments can still define --names=... to refer to as %names
+        times, _ = parse_args([arg for arg in args if arg != "--stdin"])
+        if stream(sys.stdin, times):
+            sys.exit(1)
+        return
+
+    times, tasks = parse_args(args)
+    print(times, tasks, sep="\n")
+
+    for action, times in run(times, tasks):
+        print(action)
+        for time in times:
+            print("\t", time)
 
-results = []
-for mode, batch in tasks:
-    car, cdr = batch[0], batch[1:]
 
-    b = [times[car]]
-    for name in cdr:
-        time = times[name]
-        if mode == "add":
-            b.append(b[-1] + time)
-        elif mode == "subtract":
-            b.append(b[-1] - time)
+def test():
+    from . import parsing
+    from .idling import estimator
 
-    results.append((mode, b))
+    parsing.test()
+    estimator.test()
 
 
-for action, times in results:
-    print(action)
-    for time in times:
-        print("\t", time)
+if __name__ == "__main__":
+    main(*sys.argv[1:])
 
 #  vim: set sw=4 ts=4 expandtab
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# pkg(mazunki)/chronos/array.py
+import datetime as dt
+from typing import Iterable, Iterator, Optional, Self
+
+import numpy as np
+
+from .calculate import Time
+
+__all__ = ("TimeArray",)
+
+_SECONDS = np.array([7 * 24 * 3600, 24 * 3600, 3600, 60, 1], dtype=np.int64)
+
+
+class TimeArray:
+    # columnar companion to Time: one int64 row per unit, one column per
+    # duration, so arithmetic over thousands of offsets is a handful of
+    # numpy operations instead of thousands of Time objects
+    units = ("years", "months", "weeks", "days", "hours", "minutes", "seconds")
+
+    def __init__(self, columns: np.ndarray):
+        columns = np.asarray(columns, dtype=np.int64)
+        if columns.ndim != 2 or columns.shape[0] != len(self.units):
+            raise ValueError(
+                f"expected a ({len(self.units)}, n) array, got {columns.shape}"
+            )
+        self.columns = columns
+
+    @classmethod
+    def zeros(cls, size: int) -> Self:
+        return cls(np.zeros((len(cls.units), size), dtype=np.int64))
+
+    @classmethod
+    def from_times(cls, times: Iterable[Time]) -> Self:
+        rows = [time.as_tuple for time in times]
+        if not rows:
+            return cls.zeros(0)
+        return cls(np.array(rows, dtype=np.int64).T)
+
+    @classmethod
+    def from_units(cls, **units: Iterable[int]) -> Self:
+        unknown = units.keys() - set(cls.units)
+        if unknown:
+            raise ValueError(f"{', '.join(sorted(unknown))} are not valid time units")
+
+        size = len(next(iter(units.values()))) if units else 0
+        columns = np.zeros((len(cls.units), size), dtype=np.int64)
+        for unit, values in units.items():
+            columns[cls.units.index(unit)] = values
+        return cls(columns)
+
+    def to_times(self) -> list[Time]:
+        return [Time(*row) for row in self.columns.T.tolist()]
+
+    def __len__(self):
+        return self.columns.shape[1]
+
+    def __iter__(self) -> Iterator[Time]:
+        yield from self.to_times()
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return Time(*self.columns[:, index].tolist())
+        return self.__class__(self.columns[:, index])
+
+    def __getattr__(self, unit):
+        if unit in self.units:
+            return self.columns[self.units.index(unit)]
+        raise AttributeError(f"{self.__class__.__name__} has no attribute {unit}")
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.to_times()!r})"
+
+    def _operand(self, other) -> Optional[np.ndarray]:
+        if isinstance(other, TimeArray):
+            return other.columns
+        if isinstance(other, Time):
+            return np.array(other.as_tuple, dtype=np.int64)[:, np.newaxis]
+        return None
+
+    def __neg__(self):
+        return self.__class__(-self.columns)
+
+    def __add__(self, other):
+        if (columns := self._operand(other)) is None:
+            return NotImplemented
+        return self.__class__(self.columns + columns)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if (columns := self._operand(other)) is None:
+            return NotImplemented
+        return self.__class__(self.columns - columns)
+
+    def __rsub__(self, other):
+        if (columns := self._operand(other)) is None:
+            return NotImplemented
+        return self.__class__(columns - self.columns)
+
+    @property
+    def fixed_seconds(self) -> np.ndarray:
+        # weeks and below always have the same length, unlike months
+        return _SECONDS @ self.columns[2:]
+
+    def in_future(self, now: Optional[dt.datetime] = None) -> np.ndarray:
+        base = np.datetime64(now or Time.now(), "us")
+        months = self.columns[0] * 12 + self.columns[1]
+        if months.any():
+            shifted = _add_months(base, months)
+        else:
+            shifted = np.full(len(self), base)
+        return shifted + self.fixed_seconds.astype("timedelta64[s]")
+
+    def in_past(self, now: Optional[dt.datetime] = None) -> np.ndarray:
+        return (-self).in_future(now)
+
+    def as_timedelta64(self, anchor: Optional[dt.datetime] = None) -> np.ndarray:
+        # years and months only have a length relative to some date
+        if not self.columns[:2].any():
+            return self.fixed_seconds.astype("timedelta64[s]")
+        base = np.datetime64(anchor or Time.now(), "us")
+        deltas = self.in_future(base.astype(dt.datetime)) - base
+        return deltas.astype("timedelta64[s]")
+
+
+def _add_months(base: np.datetime64, months: np.ndarray) -> np.ndarray:
+    # calendar months: keep the day of month, clamped to the target month's
+    # length (jan 31 + 1 month is feb 28/29), and keep the time of day
+    day = base.astype("datetime64[D]")
+    month = base.astype("datetime64[M]")
+    day_of_month = (day - month.astype("datetime64[D]")).astype(np.int64)
+
+    target = month + months
+    first = target.astype("datetime64[D]")
+    length = ((target + 1).astype("datetime64[D]") - first).astype(np.int64)
+    return first + np.minimum(day_of_month, length - 1) + (base - day)
+
+
+#  vim: set sw=4 ts=4 expandtab
@@ -1,12 +1,23 @@
 #!/usr/bin/env python
 import datetime as dt
+import calendar
+import operator
 
-from dataclasses import dataclass
-import itertools
-from typing import Self, Optional
+from dataclasses import dataclass, field, fields
+from typing import Iterable, Iterator, Self, Optional
 
+from .parsing import UNIT_ALIASES, parse_units
 
-@dataclass
+
+def add_months(anchor: dt.datetime, months: int) -> dt.datetime:
+    # calendar months keep the day of month, clamped to the length of the
+    # target month: jan 31 + 1 month is the last day of february
+    year, month = divmod(anchor.year * 12 + anchor.month - 1 + months, 12)
+    day = min(anchor.day, calendar.monthrange(year, month + 1)[1])
+    return anchor.replace(year=year, month=month + 1, day=day)
+
+
+@dataclass(frozen=True, slots=True)
 class Time:
     years: int = 0
     months: int = 0
@@ -17,31 +28,32 @@ class Time:
     seconds: int = 0
     label: Optional[str] = None
 
+    # every Time boils down to a number of calendar months plus a number of
+    # seconds; worked out once, since Time is immutable
+    _months: int = field(init=False, repr=False, compare=False)
+    _seconds: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_months", self.years * 12 + self.months)
+        object.__setattr__(
+            self,
+            "_seconds",
+            ((self.weeks * 7 + self.days) * 24 + self.hours) * 3600
+            + self.minutes * 60
+            + self.seconds,
+        )
+
     @staticmethod
     def of(amount: int, name: str, /, label=None):
-        if name in ("seconds", "second", "secs", "sec", "s"):
-            return Time(seconds=amount, label=label)
-        elif name in ("mins", "min"):
-            return Time(minutes=amount, label=label)
-        elif name in ("hours", "hour", "hrs", "hr", "h"):
-            return Time(hours=amount, label=label)
-        elif name in ("days", "day", "d"):
-            return Time(days=amount, label=label)
-        elif name in ("weeks", "week", "w", "wk"):
-            return Time(weeks=amount, label=label)
-        elif name in ("months", "mons", "mon"):
-            return Time(months=amount, label=label)
-        elif name in ("years", "year", "yr", "y"):
-            return Time(years=amount, label=label)
-        else:
-            raise ValueError("{name} is not a valid time unit")
+        try:
+            unit = UNIT_ALIASES[name]
+        except KeyError:
+            raise ValueError(f"{name} is not a valid time unit") from None
+        return Time(**{unit: amount}, label=label)
 
     @staticmethod
     def using(obj: dict[str, int]):
-        t = Time()
-        for unit, time in obj.items():
-            t.__dict__[unit] = time
-        return t
+        return Time(**obj)
 
     @property
     def as_tuple(self):
@@ -67,23 +79,28 @@ class Time:
             "seconds": self.seconds,
         }
 
+    @property
+    def normalized(self) -> tuple[int, int]:
+        return self._months, self._seconds
+
+    def resolve(self, anchor: Optional[dt.datetime] = None) -> dt.datetime:
+        anchor = anchor or Time.now()
+        if self._months:
+            anchor = add_months(anchor, self._months)
+        return anchor + dt.timedelta(seconds=self._seconds)
+
+    def timedelta_at(self, anchor: Optional[dt.datetime] = None) -> dt.timedelta:
+        # how long this is, starting at anchor (months and years vary)
+        anchor = anchor or Time.now()
+        return self.resolve(anchor) - anchor
+
     @property
     def as_timedelta(self):
-        return dt.timedelta(
-            # self.years,
-            # self.months,
-            # self.weeks,
-            days=self.days,
-            hours=self.hours,
-            minutes=self.minutes,
-            seconds=self.seconds,
-        )
+        return self.timedelta_at()
 
     def __repr__(self):
         values = [
-            f"{key}={val}"
-            for key, val in self.as_dict.items()
-            if val != self.__class__.__dict__[key]
+            f"{key}={val}" for key, val in self.as_dict.items() if val != _DEFAULTS[key]
         ]
         return f"{self.__class__.__name__}({", ".join(values)})"
 
@@ -92,67 +109,43 @@ class Time:
 
     @property
     def in_future(self):
-        return dt.datetime.now() + self.as_timedelta
+        return self.resolve()
 
     @property
     def in_past(self):
-        return dt.datetime.now() - self.as_timedelta
+        return (-self).resolve()
 
     @classmethod
     def now(cls):
         return dt.datetime.now()
 
     def __neg__(self):
-        return Time(**{k: -v for k, v in self.as_dict.items()})
+        return Time(*map(operator.neg, self.as_tuple))
 
     def __add__(self, other: Self):
-        return Time.using(
-            {
-                "years": self.years + other.years,
-                "months": self.months + other.months,
-                "weeks": self.weeks + other.weeks,
-                "days": self.days + other.days,
-                "hours": self.hours + other.hours,
-                "minutes": self.minutes + other.minutes,
-                "seconds": self.seconds + other.seconds,
-            }
-        )
+        return Time(*map(operator.add, self.as_tuple, other.as_tuple))
 
     def __sub__(self, other: Self):
-        return Time.using(
-            {
-                "years": other.years - self.years,
-                "months": other.months - self.months,
-                "weeks": other.weeks - self.weeks,
-                "days": other.days - self.days,
-                "hours": other.hours - self.hours,
-                "minutes": other.minutes - self.minutes,
-                "seconds": other.seconds - self.seconds,
-            }
-        )
+        return Time(*map(operator.sub, self.as_tuple, other.as_tuple))
 
     def __hash__(self):
-        return int("".join(map(str, self.as_tuple)))
+        return hash((self._months, self._seconds))
 
     @staticmethod
     def parse(human_time: str) -> "Time":
-        time_words = human_time.strip().lower().split(" ")
-
-        match time_words:
-            case ["today"]:
-                return Time(label=human_time)
-            case ["yesterday"]:
-                return Time.of(1, "days")
-            case ["tomorrow"]:
-                return Time.of(1, "days")
-            case *sometime, "ago":
-                timeunits = {u: int(t) for t, u in itertools.batched(sometime, 2)}
-                return -Time.using(timeunits)
-            case "in", *sometime:
-                timeunits = {u: int(t) for t, u in itertools.batched(sometime, 2)}
-                return Time.using(timeunits)
-            case _:
-                raise ValueError(f"[error]: couldn't parse {time_words}")
+        units, labelled = parse_units(human_time)
+        return Time(**dict(units), label=human_time if labelled else None)
+
+    @staticmethod
+    def parse_many(human_times: Iterable[str]) -> Iterator["Time"]:
+        # one expression per item (or per line, for files); blank lines and
+        # #comments are skipped
+        for human_time in human_times:
+            human_time = human_time.strip()
+            if human_time and not human_time.startswith("#"):
+                yield Time.parse(human_time)
+
 
+_DEFAULTS = {unit.name: unit.default for unit in fields(Time) if unit.init}
 
 #  vim: set sw=4 ts=4 expandtab
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# pkg(mazunki)/chronos/idling/estimator.py
+import datetime as dt
+import math
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import numpy as np
+
+from ..calculate import Time
+from .calculator import how_long
+
+__all__ = ("Estimate", "ProgressTracker")
+
+# one row per job, one column per field
+_START, _GOAL, _TIME, _PROGRESS, _RATE, _VARIANCE, _SAMPLES = range(7)
+_COLUMNS = 7
+
+
+@dataclass(frozen=True)
+class Estimate:
+    rate: float  # progress per second
+    eta: Time
+    earliest: Time
+    latest: Optional[Time]  # None while a stalled job is within the bounds
+
+
+class ProgressTracker:
+    # online ETAs for any number of named jobs. every sample updates an
+    # exponentially weighted mean and variance of the rate in O(1), with
+    # weights that decay by half every `halflife` seconds no matter how
+    # irregularly the samples arrive. state lives in a single float array,
+    # so tracking thousands of jobs costs a few dozen bytes each
+    def __init__(
+        self, halflife: float = 60.0, confidence: float = 1.96, capacity: int = 16
+    ):
+        if halflife <= 0:
+            raise ValueError(f"halflife must be positive, got {halflife}")
+        self.halflife = halflife
+        self.confidence = confidence  # in standard deviations
+        self._rows: dict[str, int] = {}
+        self._names: list[str] = []
+        self._state = np.zeros((max(capacity, 1), _COLUMNS), dtype=np.float64)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def _row(self, name: str) -> int:
+        try:
+            return self._rows[name]
+        except KeyError:
+            raise KeyError(f"{name} is not being tracked") from None
+
+    def track(self, name: str, goal: float, start: float = 0):
+        if name in self._rows:
+            raise ValueError(f"{name} is already being tracked")
+
+        row = len(self._names)
+        if row == len(self._state):
+            self._state = np.resize(self._state, (2 * row, _COLUMNS))
+        self._state[row] = 0
+        self._state[row, [_START, _GOAL, _PROGRESS]] = start, goal, start
+
+        self._rows[name] = row
+        self._names.append(name)
+
+    def forget(self, name: str):
+        # the last job takes over the freed row, keeping the array dense
+        row = self._rows.pop(name)
+        last = len(self._names) - 1
+        if row != last:
+            moved = self._names[last]
+            self._state[row] = self._state[last]
+            self._names[row] = moved
+            self._rows[moved] = row
+        self._names.pop()
+
+    def update(self, name: str, timestamp: float | dt.datetime, progress: float):
+        if isinstance(timestamp, dt.datetime):
+            timestamp = timestamp.timestamp()
+
+        state = self._state[self._row(name)]
+        samples = state[_SAMPLES]
+        elapsed = timestamp - state[_TIME]
+        if samples and elapsed <= 0:
+            return  # out of order or duplicate, nothing to learn from it
+
+        if samples:
+            rate = (progress - state[_PROGRESS]) / elapsed
+            if samples == 1:
+                state[_RATE] = rate
+            else:
+                alpha = 1 - 2 ** (-elapsed / self.halflife)
+                diff = rate - state[_RATE]
+                state[_RATE] += alpha * diff
+                state[_VARIANCE] = (1 - alpha) * (state[_VARIANCE] + alpha * diff**2)
+
+        state[_TIME] = timestamp
+        state[_PROGRESS] = progress
+        state[_SAMPLES] = samples + 1
+
+    def rate(self, name: str) -> float:
+        return float(self._state[self._row(name), _RATE])
+
+    def estimate(self, name: str) -> Optional[Estimate]:
+        # None until there are two samples and the job is actually moving
+        _, goal, _, progress, rate, variance, samples = self._state[
+            self._row(name)
+        ].tolist()
+        if samples < 2 or rate <= 0:
+            return None
+
+        spread = self.confidence * math.sqrt(variance)
+        slowest = rate - spread
+        return Estimate(
+            rate=rate,
+            eta=how_long(goal, rate, start=progress),
+            earliest=how_long(goal, rate + spread, start=progress),
+            latest=how_long(goal, slowest, start=progress) if slowest > 0 else None,
+        )
+
+    def estimates(self) -> Iterator[tuple[str, Optional[Estimate]]]:
+        for name in self._names:
+            yield name, self.estimate(name)
+
+    def seconds_left(self) -> np.ndarray:
+        # expected seconds until done for every job, in iteration order, or
+        # nan where there isn't an estimate yet
+        state = self._state[: len(self._names)]
+        rate = state[:, _RATE]
+        known = (state[:, _SAMPLES] >= 2) & (rate > 0)
+
+        left = np.full(len(state), np.nan)
+        left[known] = (state[known, _GOAL] - state[known, _PROGRESS]) / rate[known]
+        return left
+
+
+def test():
+    tracker = ProgressTracker(halflife=10, capacity=1)
+    tracker.track("steady", goal=1000)
+    tracker.track("irregular", goal=500, start=100)
+    tracker.track("bumpy", goal=100)
+    assert tracker.estimate("steady") is None
+    assert np.isnan(tracker.seconds_left()).all()
+
+    # a constant rate has no variance, so every estimate agrees
+    for t in range(21):
+        tracker.update("steady", t, 10 * t)
+    tracker.update("steady", 5, 0)  # out of order, ignored
+    steady = tracker.estimate("steady")
+    assert math.isclose(steady.rate, 10)
+    assert math.isclose(steady.eta.seconds, (1000 - 200) / 10)
+    assert steady.earliest.seconds == steady.eta.seconds == steady.latest.seconds
+
+    # however unevenly the samples are spaced
+    for t in (0, 1, 3, 7.5, 8, 20):
+        tracker.update("irregular", t, 100 + 4 * t)
+    assert math.isclose(tracker.rate("irregular"), 4)
+    assert math.isclose(tracker.estimate("irregular").eta.seconds, (500 - 180) / 4)
+
+    # a rate that keeps changing widens the bounds around the eta
+    progress = 0
+    for t in range(1, 21):
+        progress += 1 if t % 2 else 3
+        tracker.update("bumpy", t, progress)
+    bumpy = tracker.estimate("bumpy")
+    assert 1 < bumpy.rate < 3
+    assert bumpy.earliest.seconds < bumpy.eta.seconds < bumpy.latest.seconds
+
+    left = dict(zip(tracker, tracker.seconds_left().tolist()))
+    assert math.isclose(left["steady"], 80) and math.isclose(left["irregular"], 80)
+    assert math.isclose(left["bumpy"], bumpy.eta.seconds)
+
+    # the last job moves into the freed row, and keeps its own numbers
+    tracker.forget("steady")
+    assert "steady" not in tracker and list(tracker) == ["bumpy", "irregular"]
+    assert tracker.rate("bumpy") == bumpy.rate
+    assert math.isclose(tracker.rate("irregular"), 4)
+    assert tracker.seconds_left().tolist() == [left["bumpy"], left["irregular"]]
+    tracker.forget("irregular")  # the last row, nothing moves
+    assert list(tracker) == ["bumpy"] and tracker.estimate("bumpy") == bumpy
+    try:
+        tracker.rate("steady")
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("forgotten jobs should be unknown")
+
+    # stalled jobs have no estimate, and a freed name can be tracked again
+    tracker.track("steady", goal=10)
+    tracker.update("steady", 0, 5)
+    tracker.update("steady", 1, 5)
+    assert tracker.estimate("steady") is None
+    assert np.isnan(tracker.seconds_left()[1])
+    print("ok")
+
+
+#  vim: set sw=4 ts=4 expandtab
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# pkg(mazunki)/chronos/parsing.py
+import re
+import functools
+from typing import Optional
+
+__all__ = ("UNITS", "UNIT_ALIASES", "parse_units")
+
+UNITS = ("years", "months", "weeks", "days", "hours", "minutes", "seconds")
+
+UNIT_ALIASES = {
+    alias: unit
+    for unit, aliases in {
+        "seconds": ("seconds", "second", "secs", "sec", "s"),
+        "minutes": ("minutes", "minute", "mins", "min", "m"),
+        "hours": ("hours", "hour", "hrs", "hr", "h"),
+        "days": ("days", "day", "d"),
+        "weeks": ("weeks", "week", "wks", "wk", "w"),
+        "months": ("months", "month", "mons", "mon", "mo"),
+        "years": ("years", "year", "yrs", "yr", "y"),
+    }.items()
+    for alias in aliases
+}
+
+# whole expressions that are a fixed offset (and whether to keep the label)
+_KEYWORDS = {
+    "today": ((), True),
+    "now": ((), True),
+    "yesterday": ((("days", -1),), False),
+    "tomorrow": ((("days", 1),), False),
+}
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<amount>[+-]?\d+)\s*(?P<unit>[a-z]+)|(?P<word>[a-z]+)|,)\s*"
+)
+
+# PnYnMnWnDTnHnMnS, every part optional but at least one present
+_ISO_8601 = re.compile(
+    r"(?P<sign>[+-])?p"
+    r"(?:(?P<years>\d+)y)?(?:(?P<months>\d+)m)?(?:(?P<weeks>\d+)w)?(?:(?P<days>\d+)d)?"
+    r"(?:t(?=\d)(?:(?P<hours>\d+)h)?(?:(?P<minutes>\d+)m)?(?:(?P<seconds>\d+)s)?)?"
+)
+
+type Units = tuple[tuple[str, int], ...]
+
+
+def _parse_error(human_time: str) -> ValueError:
+    return ValueError(f"[error]: couldn't parse {repr(human_time)}")
+
+
+def _parse_iso(text: str) -> Optional[Units]:
+    match = _ISO_8601.fullmatch(text)
+    if not match or not any(match.group(unit) for unit in UNITS):
+        return None
+
+    sign = -1 if match.group("sign") == "-" else 1
+    return tuple(
+        (unit, sign * int(match.group(unit))) for unit in UNITS if match.group(unit)
+    )
+
+
+def _parse_words(text: str) -> Optional[Units]:
+    # "in <amounts>", "<amounts> ago" or just "<amounts>", where amounts are
+    # things like "2 weeks, 3 days and 4 hours" or "1h30m"
+    sign = 1
+    if text.startswith("in "):
+        text = text[len("in ") :]
+    elif text.endswith(" ago"):
+        text, sign = text[: -len(" ago")], -1
+
+    totals = dict.fromkeys(UNITS, 0)
+    seen = False
+
+    pos = 0
+    while pos < len(text):
+        token = _TOKEN.match(text, pos)
+        if not token or token.end() == pos:
+            return None
+        pos = token.end()
+
+        if token.group("amount"):
+            unit = UNIT_ALIASES.get(token.group("unit"))
+            if unit is None:
+                return None
+            totals[unit] += int(token.group("amount"))
+            seen = True
+        elif token.group("word") and token.group("word") != "and":
+            return None
+
+    if not seen:
+        return None
+    return tuple((unit, sign * amount) for unit, amount in totals.items() if amount)
+
+
+# parsed once per distinct expression. the result is immutable, callers
+# build their own Time objects from it
+@functools.lru_cache(maxsize=4096)
+def parse_units(human_time: str) -> tuple[Units, bool]:
+    text = human_time.strip().lower()
+
+    if text in _KEYWORDS:
+        return _KEYWORDS[text]
+
+    units = _parse_iso(text)
+    if units is None:
+        units = _parse_words(_expand_articles(text))
+    if units is None:
+        raise _parse_error(human_time)
+    return units, False
+
+
+_ARTICLE = re.compile(r"\b(?:an?)\s+(?=[a-z])")
+
+
+def _expand_articles(text: str) -> str:
+    # "an hour ago" reads as "1 hour ago"
+    return _ARTICLE.sub("1 ", text)
+
+
+def test():
+    accepted = {
+        # keywords, in any case and with surrounding space
+        "today": ((), True),
+        " Now ": ((), True),
+        "yesterday": ((("days", -1),), False),
+        "tomorrow": ((("days", 1),), False),
+        # iso 8601
+        "P1Y2M3DT4H5M6S": (
+            (
+                ("years", 1),
+                ("months", 2),
+                ("days", 3),
+                ("hours", 4),
+                ("minutes", 5),
+                ("seconds", 6),
+            ),
+            False,
+        ),
+        "-P1W": ((("weeks", -1),), False),
+        "PT1M": ((("minutes", 1),), False),
+        "P1M": ((("months", 1),), False),
+        # words
+        "2 weeks, 3 days and 4 hours": (
+            (("weeks", 2), ("days", 3), ("hours", 4)),
+            False,
+        ),
+        "1h30m": ((("hours", 1), ("minutes", 30)), False),
+        "90 mins": ((("minutes", 90),), False),
+        "in 2 hours": ((("hours", 2),), False),
+        "5 days ago": ((("days", -5),), False),
+        "an hour ago": ((("hours", -1),), False),
+        "a week": ((("weeks", 1),), False),
+        "1 day 1 day": ((("days", 2),), False),
+        "-3 yrs": ((("years", -3),), False),
+    }
+    for text, expected in accepted.items():
+        assert parse_units(text) == expected, (text, parse_units(text))
+
+    rejected = ("bogus", "", "  ", "5 parsecs", "P", "PT", "P1H", "ago", "in", "and")
+    rejected += ("5", "5 days bogus", "5 days, ago ago", "P1DT", "a", "1h30")
+    for text in rejected:
+        try:
+            units = parse_units(text)
+        except ValueError:
+            continue
+        raise AssertionError(f"{text!r} parsed as {units}")
+    print("ok")
+
+
+#  vim: set sw=4 ts=4 expandtab
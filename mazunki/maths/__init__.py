@@ -1,4 +1,13 @@
 #!/usr/bin/env python
 
-from .binary import nib
-from .logarithms import print_logtable
+from ..pythoning import lazy
+
+__getattr__, __dir__ = lazy.exports(
+    __name__,
+    {
+        "nib": ".binary:nib",
+        "logtable": ".logarithms:logtable",
+        "print_logtable": ".logarithms:print_logtable",
+    },
+)
+__all__ = ("nib", "logtable", "print_logtable")
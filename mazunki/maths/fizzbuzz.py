@@ -1,9 +1,18 @@
 #!/usr/bin/env python
 
+import functools
 import itertools
+import math
+import operator
+from typing import Iterator
+
+import numpy as np
 
 MIN, MAX = 1, 20
 
+# up to this period, labels are worked out once per residue and looked up
+WHEEL_LIMIT = 1 << 16
+
 
 @staticmethod
 def is_divisible(n: int, by: int) -> bool:
@@ -24,6 +33,7 @@ class Mask:
 class Condition:
     def __init__(self, value: str, by: int):
         self.word = value
+        self.by = by
         self.function = lambda n: is_divisible(n, by=by)
         self.function.__name__ = f"is_divisible(?, by={by})"
 
@@ -39,7 +49,18 @@ class Condition:
 
 class Fizzer:
     def __init__(self, **cases: int):
+        # checked here rather than failing halfway through a range later on
+        for word, by in cases.items():
+            try:
+                by = cases[word] = operator.index(by)
+            except TypeError:
+                raise TypeError(
+                    f"{word} must be divisible by an int, got {by!r}"
+                ) from None
+            if by == 0:
+                raise ValueError(f"{word} can't be divisible by zero")
         self.cases = [Condition(word, value) for word, value in cases.items()]
+        self.divisors = np.array([case.by for case in self.cases], dtype=np.int64)
 
     def __rmul__(self, other):
         yield from self.__matmul__(range(1, other + 1))
@@ -47,12 +68,72 @@ class Fizzer:
     def matches(self, n):
         return Mask(condition @ n for condition in self.cases)
 
+    def label(self, mask) -> str:
+        return "".join(map(str, itertools.compress(self.cases, mask))).title()
+
+    @functools.cached_property
+    def period(self) -> int:
+        # every case's divisibility repeats with the lcm of the divisors
+        return math.lcm(*self.divisors.tolist())
+
+    @functools.cached_property
+    def wheel(self) -> list[str]:
+        # the label for each residue modulo the period, "" for plain numbers
+        residues = np.arange(self.period, dtype=np.int64)
+        return [self.label(mask) for mask in self._masks(residues).T]
+
+    def _masks(self, numbers: np.ndarray) -> np.ndarray:
+        return numbers % self.divisors[:, np.newaxis] == 0
+
+    def masks(self, numbers: range) -> np.ndarray:
+        # (cases, numbers) booleans for a whole range at once
+        numbers = np.arange(numbers.start, numbers.stop, numbers.step, dtype=np.int64)
+        if self.period <= WHEEL_LIMIT:
+            return self._masks(np.arange(self.period))[:, numbers % self.period]
+        return self._masks(numbers)
+
+    def chunks(self, numbers: range, size: int = 1 << 16) -> Iterator[list]:
+        # (n, label) pairs, a list of at most `size` of them at a time, so
+        # ranges of any length can be consumed without materializing them
+        for start in range(0, len(numbers), size):
+            part = numbers[start : start + size]
+            if self.period <= WHEEL_LIMIT:
+                labels = self.wheel
+                indices = (
+                    np.arange(part.start, part.stop, part.step, dtype=np.int64)
+                    % self.period
+                ).tolist()
+            else:
+                # only as many labels as there are distinct masks
+                unique, inverse = np.unique(
+                    self.masks(part), axis=1, return_inverse=True
+                )
+                labels = [self.label(mask) for mask in unique.T]
+                indices = inverse.reshape(-1).tolist()
+
+            yield [(n, labels[i] or str(n)) for n, i in zip(part, indices)]
+
     def __matmul__(self, other):
-        for n in other:
-            yield n, (self.matches(n) @ self.cases or str(n)).title()
+        if not isinstance(other, range):
+            for n in other:
+                yield n, (self.matches(n) @ self.cases or str(n)).title()
+            return
+
+        for chunk in self.chunks(other):
+            yield from chunk
+
+
+def main(*args):
+    low, high = map(int, args) if args else (MIN, MAX)
+    for n, word in Fizzer(fizz=3, buzz=5, bazz=7, bizz=11, bim=20) @ range(
+        low, high + 1
+    ):
+        print(f"{n:5}: {word}")
+
 
+if __name__ == "__main__":
+    import sys
 
-for n, word in Fizzer(fizz=3, buzz=5, bazz=7, bizz=11, bim=20) @ range(MIN, MAX + 1):
-    print(f"{n:5}: {word}")
+    main(*sys.argv[1:])
 
 #  vim: set sw=4 ts=4 expandtab
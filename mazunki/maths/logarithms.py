@@ -1,27 +1,105 @@
 #!/usr/bin/env python
-from rich.console import Console
-from rich.table import Table
+# pkg(mazunki)/maths/logarithms.py
+import csv
 import math
+import sys
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Literal, Mapping, Optional, TextIO
+
+import numpy as np
+
+__all__ = ("LogTable", "logtable", "print_logtable")
+
+_BASE_NAMES = {10: "log_10", 2: "log_2", math.e: "ln"}
+
+# exact for exact powers, where log(x) / log(base) can be off by an ulp
+_LOGS = {10: np.log10, 2: np.log2, math.e: np.log}
+
+
+def _log(values: np.ndarray, base: float) -> np.ndarray:
+    if base in _LOGS:
+        return _LOGS[base](values)
+    return np.log(values) / np.log(base)
 
-def print_logtable():
-    console = Console()
 
-    table = Table()
+@dataclass(frozen=True, eq=False)
+class LogTable:
+    # one column per base, one row per value. rendering is all that's left
+    # to do, the logs themselves are computed up front in one pass
+    labels: tuple[str, ...]
+    values: np.ndarray
+    bases: tuple[float, ...]
+    logs: np.ndarray  # (bases, values)
 
-    table.add_column("n", justify="right")
-    table.add_column("log_10(n)", justify="right")
-    
-    for n in range(1, 10):
-        table.add_row(f"{n/10}", f"{math.log10(n/10)*100:.1f}%")
+    @property
+    def headers(self) -> list[str]:
+        return ["n"] + [f"{_BASE_NAMES.get(b, f'log_{b:g}')}(n)" for b in self.bases]
 
-    for n in range(1, 11):
-        table.add_row(f"{n}", f"{math.log10(n)*100:.1f}%")
+    def rows(self, fmt: str = "{:.1%}") -> Iterator[list[str]]:
+        for label, logs in zip(self.labels, self.logs.T.tolist()):
+            yield [label, *map(fmt.format, logs)]
 
+    def render(
+        self,
+        form: Literal["rich", "plain", "csv"] = "rich",
+        file: Optional[TextIO] = None,
+        fmt: str = "{:.1%}",
+    ):
+        if form == "csv":
+            # exact numbers rather than formatted percentages
+            writer = csv.writer(file or sys.stdout)
+            writer.writerow(self.headers)
+            writer.writerows(
+                [label, *logs] for label, logs in zip(self.labels, self.logs.T.tolist())
+            )
+        elif form == "plain":
+            rows = [self.headers, *self.rows(fmt)]
+            widths = [max(map(len, column)) for column in zip(*rows)]
+            (file or sys.stdout).writelines(
+                "  ".join(cell.rjust(width) for cell, width in zip(row, widths)) + "\n"
+                for row in rows
+            )
+        elif form == "rich":
+            # rich takes a while to import, only pay for it when it's used
+            from rich.console import Console
+            from rich.table import Table
 
-    constants = { "ℇ": math.e, "π": math.pi }
+            table = Table()
+            for header in self.headers:
+                table.add_column(header, justify="right")
+            for row in self.rows(fmt):
+                table.add_row(*row)
+            Console(file=file).print(table)
+        else:
+            raise ValueError(f"unknown form {form}")
+
+
+def logtable(
+    values: Iterable[float] | Mapping[str, float],
+    bases: Iterable[float] = (10,),
+    labels: Optional[Iterable[str]] = None,
+) -> LogTable:
+    # values may map labels to values, otherwise they're labelled as %g
+    if isinstance(values, Mapping):
+        labels, values = values.keys(), values.values()
+    values = np.fromiter(values, dtype=np.float64)
+    bases = tuple(bases)
+    if not bases:
+        raise ValueError("at least one base is needed")
+    labels = tuple(labels) if labels is not None else tuple(f"{v:g}" for v in values)
+    if len(labels) != len(values):
+        raise ValueError(f"{len(labels)} labels for {len(values)} values")
+
+    logs = np.stack([_log(values, base) for base in bases])
+    return LogTable(labels, values, bases, logs)
+
+
+def print_logtable():
+    values = {f"{n / 10}": n / 10 for n in range(1, 10)}
+    values |= {f"{n}": n for n in range(1, 11)}
+    values |= {"ℇ": math.e, "π": math.pi}
 
-    for repr, n in constants.items():
-        table.add_row(repr, f"{math.log10(n)*100:.1f}%")
+    logtable(values).render()
 
 
-    console.print(table)
+#  vim: set sw=4 ts=4 expandtab
@@ -1,20 +1,27 @@
 #!/usr/bin/env python
 
-from ..pythoning.fmt.formatters import cells
+from typing import Optional
+
+from ..pythoning.fmt.expressions import write_cells
+from ..pythoning.fmt.tables import TableWriter, fit_columns
 
 
 def times_table(a: int, max: int = 10) -> None:
     len_rhs = len(str(a * max))
     len_b = len(str(max))
-    for b in range(max + 1):
-        result = a * b
-        lhs = f" {a} × {b:>{len_b}}"
-        rhs = f"{result}"
-        print(f"{lhs:<4} = {rhs:>{len_rhs}}")
+    # " a × b" is never shorter than the 4 it used to be padded to
+    line = f" {a} × {{:>{len_b}}} = {{:>{len_rhs}}}\n"
+    with TableWriter() as table:
+        for b in range(max + 1):
+            table.write(line.format(b, a * b))
 
 
-def multiply_to(n: int, using: int):
-    print(cells(range(1, n + 1), max=using, width=5))
+def multiply_to(n: int, using: Optional[int] = None):
+    # as many columns as fit in the terminal unless told otherwise
+    width = max(5, len(str(n)))
+    using = using or fit_columns(width + 2)
+    with TableWriter() as table:
+        write_cells(range(1, n + 1), table.write, max=using, width=width)
 
 
 #  vim: set sw=4 ts=4 expandtab
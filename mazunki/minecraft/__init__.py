@@ -1,18 +1,77 @@
 #!/usr/bin/env python
 # pkg(mazunki)/minecraft/__init__.py
-from typing import Optional
+from typing import Any, Optional
 
+from ..pythoning.fmt.templates import compile_template
 
-class Chest:
+
+class _Default:
+    # a per-instance value stored in a slot, which reads as the default when
+    # looked up on the class itself (Chest.slots is still 27). read-only,
+    # since instances are shared
+    def __init__(self, default, slot: str):
+        self.default = default
+        self.slot = slot
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self.default
+        return getattr(instance, self.slot)
+
+
+def _defaults(cls, *names: str):
+    # lets subclasses keep overriding defaults with plain class attributes
+    for name in names:
+        value = vars(cls).get(name)
+        if value is not None and not isinstance(value, _Default):
+            setattr(cls, name, _Default(value, f"_{name}"))
+
+
+class _Interned:
+    # flyweights: constructing one with the same arguments twice hands back
+    # the same object, so inventories share a handful of instances
+    __slots__ = ()
+    _interned: dict = {}
+
+    @classmethod
+    def _intern(cls, key, **values):
+        try:
+            return _Interned._interned[key]
+        except KeyError:
+            instance = object.__new__(cls)
+            for name, value in values.items():
+                object.__setattr__(instance, f"_{name}", value)
+            return _Interned._interned.setdefault(key, instance)
+
+    def __reduce__(self):
+        # copies and unpickling go through the registry too
+        return self.__class__, self._key[1:]
+
+
+class Chest(_Interned):
+    __slots__ = ("_slots", "_stack_multiplier")
     slots = 27
     stack_multiplier = 1
     name = "chests"
 
-    def __init__(
-        self, slots: Optional[int] = None, stack_multiplier: Optional[int] = None
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _defaults(cls, "slots", "stack_multiplier")
+
+    def __new__(
+        cls, slots: Optional[int] = None, stack_multiplier: Optional[int] = None
     ):
-        self.slots = slots or Chest.slots
-        self.stack_multiplier = stack_multiplier or Chest.stack_multiplier
+        slots = slots or cls.slots
+        stack_multiplier = stack_multiplier or cls.stack_multiplier
+        return cls._intern(
+            (cls, slots, stack_multiplier),
+            slots=slots,
+            stack_multiplier=stack_multiplier,
+        )
+
+    @property
+    def _key(self):
+        return self.__class__, self.slots, self.stack_multiplier
 
     def __repr__(self):
         args = []
@@ -24,23 +83,32 @@ class Chest:
         return f"{self.__class__.__name__}({','.join(args)})"
 
 
+_defaults(Chest, "slots", "stack_multiplier")
+
+
 class DoubleChest(Chest):
     name: str = "double chests"
     slots: int = 2 * Chest.slots
 
 
 class ShulkerBox(Chest):
-    slots: int = 54
+    slots: int = Chest.slots
     name: str = "shulker boxes"
 
 
-class Item:
+class Item(_Interned):
+    __slots__ = ("_stack", "_name")
     stack: int = 64
     name: str = "items"
 
-    def __init__(self, stack: Optional[int] = None, name: Optional[str] = None):
-        self.stack: int = stack or Item.stack
-        self.name: str = name or Item.name
+    def __new__(cls, stack: Optional[int] = None, name: Optional[str] = None):
+        stack = stack or Item.stack
+        name = name or Item.name
+        return cls._intern((cls, stack, name), stack=stack, name=name)
+
+    @property
+    def _key(self):
+        return self.__class__, self.stack, self.name
 
     def __repr__(self):
         args = []
@@ -62,7 +130,11 @@ class Item:
         return self.__mul__(other)
 
 
+_defaults(Item, "stack", "name")
+
+
 class Quantity:
+    __slots__ = ("quantity", "_item", "_chest")
     item = Item()
     chest = Chest()
 
@@ -70,12 +142,13 @@ class Quantity:
         self, quantity: int, item: Optional[Item] = None, chest: Optional[Chest] = None
     ):
         self.quantity = quantity
-        self.item = item or self.__class__.item
-        self.chest = chest or self.__class__.chest
+        self._item = item or self.__class__.item
+        self._chest = chest or self.__class__.chest
 
     @property
     def total_slots(self):
-        return self.in_stacks + bool(self.in_stacks[1])
+        full_stacks, extra_items = self.in_stacks
+        return full_stacks + bool(extra_items)
 
     @property
     def in_stacks(self):
@@ -88,26 +161,35 @@ class Quantity:
 
         return full_chests, extra_slots, extra_items
 
+    # %q quantity, %i item, %s full stacks, %x items left over, %c full
+    # chests, %C chest, %l slots left over
+    specifiers = frozenset("qisxcCl")
+    formats = {
+        "qty": "%q %i",
+        "stacks": "%s slots + %x %i",
+        "boxes": "%c %C + %l slots + %x %i",
+    }
+    formats["oneline"] = formats["chests"] = formats["boxes"]
+    formats[""] = "\n".join((formats["qty"], formats["stacks"], formats["boxes"]))
+
+    @property
+    def values(self) -> dict[str, Any]:
+        full_stacks, extra_items = self.in_stacks
+        full_chests, extra_slots = divmod(full_stacks, self.chest.slots)
+        return {
+            "q": self.quantity,
+            "i": self.item.name,
+            "s": full_stacks,
+            "x": extra_items,
+            "c": full_chests,
+            "C": self.chest.name,
+            "l": extra_slots,
+        }
+
     def __format__(self, fmt=""):
-        if fmt in ["oneline", "boxes", "chests"]:
-            fmt = "{{}} {} + {{}} slots + {{}} {}".format(
-                self.chest.name, self.item.name
-            )
-            return fmt.format(*self.in_chests)
-        elif fmt == "stacks":
-            fmt = "{{}} slots + {{}} {}".format(self.item.name)
-            return fmt.format(*self.in_stacks)
-        elif fmt == "qty":
-            fmt = "{{}} {}".format(self.item.name)
-            return fmt.format(self.quantity)
-        else:
-            return "\n".join(
-                (
-                    self.__format__("qty"),
-                    self.__format__("stacks"),
-                    self.__format__("boxes"),
-                )
-            )
+        # one of the named formats, a %-template, or all of qty/stacks/boxes
+        fmt = self.formats.get(fmt, fmt if "%" in fmt else self.formats[""])
+        return compile_template(fmt, self.specifiers).render(self.values.__getitem__)
 
     def __str__(self):
         return self.__format__()
@@ -127,6 +209,17 @@ class Quantity:
         return Quantity(self.quantity, self.item, other)
 
 
+_defaults(Quantity, "item", "chest")
+
+
 def test():
+    # a shulker box holds what a single chest does
+    assert ShulkerBox.slots == ShulkerBox().slots == Chest.slots == 27
+    assert DoubleChest().slots == 2 * Chest().slots
+
     for qty in map(Quantity, (1000, 1727, 1728, 1729, 2000, 3000)):
         print(repr(qty))
+
+    from . import packing
+
+    packing.test()
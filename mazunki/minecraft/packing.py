@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# pkg(mazunki)/minecraft/packing.py
+from typing import Iterable, Optional
+
+import numpy as np
+
+from . import Chest, DoubleChest, ShulkerBox, Quantity
+
+__all__ = (
+    "as_arrays",
+    "in_stacks",
+    "total_slots",
+    "in_chests",
+    "containers_for",
+    "plan",
+)
+
+# the same divmod chains as Quantity.in_stacks/in_chests/total_slots, but
+# over whole arrays of quantities and stack sizes at once
+
+
+def as_arrays(quantities: Iterable[Quantity]) -> tuple[np.ndarray, np.ndarray]:
+    pairs = [(qty.quantity, qty.item.stack) for qty in quantities]
+    if not pairs:
+        return np.zeros(0, dtype=np.int64), np.ones(0, dtype=np.int64)
+    counts, stacks = np.array(pairs, dtype=np.int64).T
+    return counts, stacks
+
+
+def in_stacks(counts, stacks) -> tuple[np.ndarray, np.ndarray]:
+    return np.divmod(np.asarray(counts, dtype=np.int64), stacks)
+
+
+def total_slots(counts, stacks) -> np.ndarray:
+    full_stacks, extra_items = in_stacks(counts, stacks)
+    return full_stacks + (extra_items > 0)
+
+
+def in_chests(
+    counts, stacks, slots=Chest.slots
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    full_stacks, extra_items = in_stacks(counts, stacks)
+    full_chests, extra_slots = np.divmod(full_stacks, slots)
+    return full_chests, extra_slots, extra_items
+
+
+def containers_for(slots: int, containers: Iterable[Chest]) -> list[Chest]:
+    # every slot holds any one stack, so the fewest containers is as many of
+    # the biggest as needed, with the smallest one that fits the rest last.
+    # ties go to whichever container was listed first
+    containers = list(containers)
+    biggest = max(containers, key=lambda container: container.slots)
+    full, rest = divmod(slots, biggest.slots)
+
+    layout = [biggest] * full
+    if rest:
+        layout.append(
+            min(
+                (container for container in containers if container.slots >= rest),
+                key=lambda container: container.slots,
+            )
+        )
+    return layout
+
+
+def plan(
+    quantities: Iterable[Quantity], containers: Optional[Iterable[Chest]] = None
+) -> list[tuple[Chest, list[Quantity]]]:
+    # lays the stacks out one item after another across the containers, so
+    # an item is only split where a container runs out of slots. each
+    # container comes with what goes in it, as Quantity objects stored @ it
+    quantities = list(quantities)
+    counts, stacks = as_arrays(quantities)
+    slots = total_slots(counts, stacks)
+    layout = containers_for(
+        int(slots.sum()), containers or (Chest(), DoubleChest(), ShulkerBox())
+    )
+
+    ends = np.cumsum(slots)
+    starts = ends - slots
+    # items missing from the last slot of each item
+    shortfall = slots * stacks - counts
+
+    packed = []
+    offset = 0
+    for container in layout:
+        low, high = offset, offset + container.slots
+        first = np.searchsorted(ends, low, side="right")
+        last = np.searchsorted(starts, high, side="left")
+
+        span = slice(first, last)
+        taken = np.minimum(ends[span], high) - np.maximum(starts[span], low)
+        amounts = taken * stacks[span] - np.where(
+            ends[span] <= high, shortfall[span], 0
+        )
+
+        packed.append(
+            (
+                container,
+                [
+                    Quantity(amount, quantities[i].item, container)
+                    for i, amount in zip(range(first, last), amounts.tolist())
+                    if amount > 0
+                ],
+            )
+        )
+        offset = high
+    return packed
+
+
+def test():
+    from . import Item
+
+    cobblestone, pearl = Item(64, "cobblestone"), Item(16, "ender pearl")
+    sword, dirt, egg = Item(1, "sword"), Item(64, "dirt"), Item(16, "egg")
+    quantities = [
+        Quantity(4000, cobblestone),  # 62 stacks and a partial one
+        Quantity(50, pearl),
+        Quantity(3, sword),
+        Quantity(0, Item(64, "nothing")),
+        Quantity(130, dirt),
+        Quantity(17, egg),
+    ]
+    counts, stacks = as_arrays(quantities)
+    slots = total_slots(counts, stacks)
+    assert slots.tolist() == [63, 4, 3, 0, 3, 2]
+    assert slots.tolist() == [qty.total_slots for qty in quantities]
+
+    for containers in (None, [ShulkerBox()], [Chest(), DoubleChest()]):
+        packed = plan(quantities, containers)
+        layout = [container for container, _ in packed]
+        expected = containers_for(
+            int(slots.sum()), containers or (Chest(), DoubleChest(), ShulkerBox())
+        )
+        assert layout == expected, (layout, expected)
+
+        # every item ends up somewhere, exactly once, and nothing is made up
+        found = {}
+        for container, contents in packed:
+            for qty in contents:
+                assert qty.chest is container and qty.quantity > 0, qty
+                found[qty.item] = found.get(qty.item, 0) + qty.quantity
+        assert found == {qty.item: qty.quantity for qty in quantities if qty.quantity}
+
+        # containers fill up in order, only the last one has room left
+        used = [sum(qty.total_slots for qty in contents) for _, contents in packed]
+        assert sum(used) == slots.sum()
+        assert used[:-1] == [container.slots for container in layout[:-1]]
+        assert 0 < used[-1] <= layout[-1].slots
+
+    # 75 slots: a double chest and a chest, with the cobblestone split
+    (double, first), (single, second) = plan(quantities)
+    assert (double, single) == (DoubleChest(), Chest())
+    assert [qty.quantity for qty in first] == [54 * 64]
+    assert [qty.quantity for qty in second] == [4000 - 54 * 64, 50, 3, 130, 17]
+    assert plan([]) == []
+    print("ok")
+
+
+#  vim: set sw=4 ts=4 expandtab
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# pkg(mazunki)/minecraft/registry.py
+import functools
+import importlib.resources
+import os
+from typing import Iterable, Optional
+
+from . import Chest, DoubleChest, ShulkerBox, Item
+
+__all__ = ("load_items", "vanilla_items", "item", "containers")
+
+# every container type, by the name they go by in formatted output
+containers: dict[str, Chest] = {
+    container.name: container for container in (Chest(), DoubleChest(), ShulkerBox())
+}
+
+
+def _parse(lines: Iterable[str]) -> dict[str, Item]:
+    # "<item id>\t<stack size>" per line, # for comments
+    items = {}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        name, stack = line.split()
+        items[name] = Item(int(stack), name.replace("_", " "))
+    return items
+
+
+def load_items(path: str | os.PathLike) -> dict[str, Item]:
+    with open(path) as f:
+        return _parse(f)
+
+
+@functools.cache
+def vanilla_items() -> dict[str, Item]:
+    # not every vanilla item, see the header of items.tsv for what's covered
+    data = importlib.resources.files(__package__) / "items.tsv"
+    with data.open() as f:
+        return _parse(f)
+
+
+def item(name: str, stack: Optional[int] = None) -> Item:
+    # both "ender_pearl" and "ender pearl" work. items that aren't listed
+    # are a KeyError, unless the stack size to fall back to is given
+    key = name.strip().lower().replace(" ", "_")
+    try:
+        return vanilla_items()[key]
+    except KeyError:
+        if stack is None:
+            raise KeyError(f"{name} is not a known item") from None
+        return Item(stack, key.replace("_", " "))
+
+
+#  vim: set sw=4 ts=4 expandtab
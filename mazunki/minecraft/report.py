@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# pkg(mazunki)/minecraft/report.py
+import csv
+import itertools
+import json
+import sys
+from typing import Iterable, Iterator, Literal, Optional, TextIO
+
+import numpy as np
+
+from ..pythoning.fmt.templates import compile_template
+from . import Quantity
+from .packing import in_stacks
+
+__all__ = ("columns", "render")
+
+# what csv and json call each of Quantity's specifiers, in row order
+columns = {
+    "quantity": "q",
+    "item": "i",
+    "stacks": "s",
+    "extra_items": "x",
+    "chests": "c",
+    "chest": "C",
+    "slots": "l",
+}
+_fields = tuple(columns.values())
+
+
+def _rows(quantities: Iterable[Quantity], chunk: int) -> Iterator[list[tuple]]:
+    # Quantity.values as tuples in column order, a chunk at a time, with the
+    # divmods done over arrays. items and chests are shared instances, so
+    # whatever is needed from them is looked up once per chunk, not per row
+    quantities = iter(quantities)
+    while batch := [
+        (qty.quantity, qty.item, qty.chest)
+        for qty in itertools.islice(quantities, chunk)
+    ]:
+        counts, items, chests = zip(*batch)
+        items = {item: (item.name, item.stack) for item in set(items)}.__getitem__
+        chests = {chest: (chest.name, chest.slots) for chest in set(chests)}.__getitem__
+        item_names, stacks = zip(*map(items, (item for _, item, _ in batch)))
+        chest_names, slots = zip(*map(chests, (chest for _, _, chest in batch)))
+
+        full_stacks, extra_items = in_stacks(counts, stacks)
+        full_chests, extra_slots = np.divmod(full_stacks, slots)
+
+        yield list(
+            zip(
+                counts,
+                item_names,
+                full_stacks.tolist(),
+                extra_items.tolist(),
+                full_chests.tolist(),
+                chest_names,
+                extra_slots.tolist(),
+            )
+        )
+
+
+def _text(chunks, file: TextIO, fmt: str):
+    fmt = Quantity.formats.get(fmt, fmt)
+    line = compile_template(fmt, Quantity.specifiers).as_format(_fields) + "\n"
+    for rows in chunks:
+        file.write("".join(line.format(*row) for row in rows))
+
+
+def _csv(chunks, file: TextIO, fmt: str):
+    writer = csv.writer(file)
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows(rows)
+
+
+def _json(chunks, file: TextIO, fmt: str):
+    separator = "\n"
+    file.write("[")
+    for rows in chunks:
+        file.write(
+            separator
+            + ",\n".join(f"  {json.dumps(dict(zip(columns, row)))}" for row in rows)
+        )
+        separator = ",\n"
+    file.write("\n]\n" if separator != "\n" else "]\n")
+
+
+_writers = {"text": _text, "csv": _csv, "json": _json}
+
+
+def render(
+    quantities: Iterable[Quantity],
+    file: Optional[TextIO] = None,
+    *,
+    form: Literal["text", "csv", "json"] = "text",
+    fmt: str = "oneline",
+    chunk: int = 4096,
+) -> int:
+    # writes the whole report to file a chunk at a time. fmt picks one of
+    # Quantity.formats (or any %-template) for text, csv and json always
+    # get every column. returns how many quantities were written. file
+    # defaults to whatever sys.stdout is at the time
+    file = file or sys.stdout
+    count = 0
+
+    def counted(chunks):
+        nonlocal count
+        for rows in chunks:
+            count += len(rows)
+            yield rows
+
+    _writers[form](counted(_rows(quantities, chunk)), file, fmt)
+    return count
+
+
+#  vim: set sw=4 ts=4 expandtab
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# pkg(mazunki)/projects/discovery.py
+import os
+import queue
+import pathlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, Optional
+
+__all__ = ("REPO_MARKER", "PRUNED_DIRS", "scan_directory", "find_repo_roots")
+
+REPO_MARKER = ".git"
+
+# never worth descending into: vcs internals, dependency trees and tool caches
+PRUNED_DIRS = frozenset(
+    {
+        ".git",
+        ".hg",
+        ".svn",
+        "node_modules",
+        "__pycache__",
+        ".venv",
+        "venv",
+        ".tox",
+        ".nox",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".ruff_cache",
+    }
+)
+
+
+# one scandir pass: is `path` a repo root, and which subdirs to visit next
+def scan_directory(
+    path: str, pruned: frozenset[str] = PRUNED_DIRS
+) -> tuple[str, bool, list[str]]:
+    subdirs = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name == REPO_MARKER:
+                    # found a repo, so nothing below it is interesting
+                    return path, True, []
+                if entry.name in pruned:
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                except OSError:
+                    pass
+    except OSError:
+        return path, False, []
+
+    return path, False, subdirs
+
+
+# yields every repo root under `directory` as soon as its scan completes
+def find_repo_roots(
+    directory: pathlib.Path | str,
+    *,
+    workers: Optional[int] = None,
+    pruned: frozenset[str] = PRUNED_DIRS,
+    scan: Optional[Callable[[str], tuple[str, bool, list[str]]]] = None,
+) -> Iterator[pathlib.Path]:
+    scan = scan or functools.partial(scan_directory, pruned=pruned)
+    results = queue.SimpleQueue()
+    pool = ThreadPoolExecutor(max_workers=workers)
+
+    def submit(path):
+        pool.submit(scan, path).add_done_callback(results.put)
+
+    try:
+        submit(os.fspath(directory))
+        outstanding = 1
+        while outstanding:
+            path, is_repo, subdirs = results.get().result()
+            outstanding -= 1
+            if is_repo:
+                yield pathlib.Path(path)
+
+            for subdir in subdirs:
+                submit(subdir)
+            outstanding += len(subdirs)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+#  vim: set sw=4 ts=4 expandtab
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# pkg(mazunki)/projects/gitmeta.py
+#
+# just enough of git's on-disk format to answer "who owns this and when was
+# it last committed to" without spawning git or building GitPython objects.
+# anything unusual (deltified commits, alternates, v1 pack indexes...) makes
+# these return None, and callers fall back to GitPython.
+import os
+import re
+import glob
+import mmap
+import zlib
+import bisect
+import struct
+import datetime
+from typing import Optional
+
+__all__ = ("git_dirs", "remote_urls", "resolve_head", "commit_date")
+
+_SECTION = re.compile(r'\s*\[\s*([^\s\]"]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]')
+_PACK_COMMIT = 1
+_CHUNK = 4096
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def git_dirs(worktree: os.PathLike | str) -> tuple[str, str]:
+    # -> (git dir, common dir); they only differ for linked worktrees
+    git_dir = os.path.join(worktree, ".git")
+    if os.path.isfile(git_dir):
+        # submodules and worktrees: .git is a "gitdir: <path>" pointer file
+        content = _read_text(git_dir) or ""
+        if content.startswith("gitdir:"):
+            git_dir = os.path.join(worktree, content[len("gitdir:") :].strip())
+
+    common = _read_text(os.path.join(git_dir, "commondir"))
+    common_dir = os.path.join(git_dir, common.strip()) if common else git_dir
+    return os.path.normpath(git_dir), os.path.normpath(common_dir)
+
+
+def remote_urls(common_dir: str) -> list[str]:
+    # remote urls in config order, which is what GitPython's repo.remotes uses
+    urls = []
+    section = None
+    for line in (_read_text(os.path.join(common_dir, "config")) or "").splitlines():
+        if match := _SECTION.match(line):
+            section = match.group(1).lower()
+            continue
+        key, sep, value = line.partition("=")
+        if sep and section == "remote" and key.strip().lower() == "url":
+            urls.append(value.strip().strip('"'))
+    return urls
+
+
+def _packed_ref(common_dir: str, ref: str) -> Optional[str]:
+    for line in (
+        _read_text(os.path.join(common_dir, "packed-refs")) or ""
+    ).splitlines():
+        sha, _, name = line.partition(" ")
+        if name == ref:
+            return sha
+    return None
+
+
+def resolve_head(git_dir: str, common_dir: str) -> Optional[str]:
+    head = (_read_text(os.path.join(git_dir, "HEAD")) or "").strip()
+    for _ in range(8):  # symbolic refs can chain, but not forever
+        if not head.startswith("ref:"):
+            return head if len(head) == 40 else None
+
+        ref = head[len("ref:") :].strip()
+        for base in (git_dir, common_dir):
+            if (content := _read_text(os.path.join(base, ref))) is not None:
+                head = content.strip()
+                break
+        else:
+            return _packed_ref(common_dir, ref)
+    return None
+
+
+def _loose_object(common_dir: str, sha: str) -> Optional[tuple[bytes, bytes]]:
+    try:
+        with open(os.path.join(common_dir, "objects", sha[:2], sha[2:]), "rb") as f:
+            raw = zlib.decompress(f.read())
+    except (OSError, zlib.error):
+        return None
+
+    header, _, body = raw.partition(b"\0")
+    return header.split(b" ", 1)[0], body
+
+
+def _pack_offset(index: mmap.mmap, binsha: bytes) -> Optional[int]:
+    # pack index v2: magic, version, 256 fanout entries, then sorted shas,
+    # crc32s, 31-bit offsets and the 64-bit offset overflow table
+    if index[:8] != b"\377tOc\0\0\0\2":
+        return None
+
+    fanout = struct.unpack_from(">256I", index, 8)
+    lo = fanout[binsha[0] - 1] if binsha[0] else 0
+    hi, total = fanout[binsha[0]], fanout[255]
+
+    shas = 8 + 4 * 256
+    key = lambda i: index[shas + 20 * i : shas + 20 * i + 20]
+    pos = bisect.bisect_left(range(lo, hi), binsha, key=key) + lo
+    if pos >= hi or key(pos) != binsha:
+        return None
+
+    offsets = shas + 24 * total
+    offset = struct.unpack_from(">I", index, offsets + 4 * pos)[0]
+    if offset & 0x80000000:
+        large = offsets + 4 * total + 8 * (offset & 0x7FFFFFFF)
+        offset = struct.unpack_from(">Q", index, large)[0]
+    return offset
+
+
+def _packed_commit(pack_path: str, offset: int) -> Optional[bytes]:
+    with open(pack_path, "rb") as f:
+        f.seek(offset)
+        byte = f.read(1)[0]
+        kind = (byte >> 4) & 0b111
+        while byte & 0x80:
+            byte = f.read(1)[0]
+        if kind != _PACK_COMMIT:
+            return None
+
+        decompressor = zlib.decompressobj()
+        body = []
+        while not decompressor.eof:
+            chunk = f.read(_CHUNK)
+            if not chunk:
+                return None
+            body.append(decompressor.decompress(chunk))
+        return b"".join(body)
+
+
+def _read_commit(common_dir: str, sha: str) -> Optional[bytes]:
+    if loose := _loose_object(common_dir, sha):
+        kind, body = loose
+        return body if kind == b"commit" else None
+
+    binsha = bytes.fromhex(sha)
+    for index_path in glob.glob(os.path.join(common_dir, "objects", "pack", "*.idx")):
+        try:
+            with (
+                open(index_path, "rb") as f,
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as index,
+            ):
+                offset = _pack_offset(index, binsha)
+            if offset is not None:
+                return _packed_commit(index_path[: -len(".idx")] + ".pack", offset)
+        except (OSError, ValueError, IndexError, struct.error, zlib.error):
+            return None
+    return None
+
+
+def commit_date(common_dir: str, sha: str) -> Optional[datetime.datetime]:
+    # same value as GitPython's commit.committed_datetime
+    body = _read_commit(common_dir, sha)
+    if body is None:
+        return None
+
+    for line in body.split(b"\n"):
+        if not line:
+            break  # end of headers
+        if line.startswith(b"committer "):
+            try:
+                _, timestamp, tz = line.rsplit(b" ", 2)
+                sign = -1 if tz[:1] == b"-" else 1
+                offset = datetime.timedelta(hours=int(tz[1:3]), minutes=int(tz[3:5]))
+                return datetime.datetime.fromtimestamp(
+                    int(timestamp), datetime.timezone(sign * offset)
+                )
+            except ValueError:
+                return None
+    return None
+
+
+def test():
+    import subprocess
+    import tempfile
+
+    env = os.environ | {
+        "GIT_AUTHOR_NAME": "test",
+        "GIT_AUTHOR_EMAIL": "test@localhost",
+        "GIT_COMMITTER_NAME": "test",
+        "GIT_COMMITTER_EMAIL": "test@localhost",
+        "GIT_COMMITTER_DATE": "2021-03-04T05:06:07+0130",
+        "GIT_CONFIG_NOSYSTEM": "1",
+        "HOME": os.devnull,
+    }
+
+    with tempfile.TemporaryDirectory() as worktree:
+        git = lambda *args: subprocess.run(
+            ["git", "-C", worktree, *args],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+
+        git("init", "-q")
+        for n in range(3):
+            with open(os.path.join(worktree, "file"), "w") as f:
+                f.write(f"{n}\n")
+            git("add", "file")
+            git("commit", "-q", "-m", f"commit {n}")
+
+        git_dir, common_dir = git_dirs(worktree)
+        expected = datetime.datetime.fromisoformat(git("log", "-1", "--format=%cI"))
+
+        # loose objects, then the same commit from a v2 pack after gc
+        for objects in ("loose", "packed"):
+            if objects == "packed":
+                git("gc", "-q", "--prune=now")
+                assert not glob.glob(os.path.join(common_dir, "objects", "??", "*"))
+            sha = resolve_head(git_dir, common_dir)
+            assert sha == git("rev-parse", "HEAD"), (objects, sha)
+            date = commit_date(common_dir, sha)
+            assert date == expected, (objects, date, expected)
+            assert date.utcoffset() == expected.utcoffset(), objects
+
+        # gc packs refs too, so this went through packed-refs
+        assert not os.path.exists(os.path.join(common_dir, git("symbolic-ref", "HEAD")))
+    print("ok")
+
+
+#  vim: set sw=4 ts=4 expandtab
@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# pkg(mazunki)/projects/index.py
+import os
+import json
+import time
+import fcntl
+import hashlib
+import itertools
+import pathlib
+import tempfile
+import contextlib
+from typing import Iterator, Optional
+
+from ..pythoning import xdg
+from ..pythoning.atomic import write_json
+from . import discovery
+
+__all__ = ("ProjectIndex", "index_directory")
+
+INDEX_VERSION = 1
+
+
+def index_directory() -> pathlib.Path:
+    return pathlib.Path(xdg.cache_path("mazunki")) / "projects"
+
+
+class ProjectIndex:
+    # one index per scanned root, split in two files so the common "just give
+    # me the repos" path never has to parse the (large) directory tree:
+    #   <key>.json       {version, root, scanned, repos}
+    #   <key>.tree.json  {version, dirs: {path: [mtime_ns, is_repo, subdirs]}}
+
+    def __init__(
+        self,
+        root: pathlib.Path | str,
+        *,
+        directory: Optional[pathlib.Path | str] = None,
+        pruned: frozenset[str] = discovery.PRUNED_DIRS,
+    ):
+        self.root = pathlib.Path(root).resolve()
+        self.directory = pathlib.Path(directory or index_directory())
+        self.pruned = pruned
+
+        key = hashlib.sha1(str(self.root).encode()).hexdigest()[:16]
+        self.meta_path = self.directory / f"{key}.json"
+        self.tree_path = self.directory / f"{key}.tree.json"
+        self.lock_path = self.directory / f"{key}.lock"
+
+    def projects(
+        self,
+        *,
+        max_age: float = 0,
+        refresh: bool = False,
+        workers: Optional[int] = None,
+    ) -> list[pathlib.Path]:
+        return list(self.stream(max_age=max_age, refresh=refresh, workers=workers))
+
+    def stream(
+        self,
+        *,
+        max_age: float = 0,
+        refresh: bool = False,
+        workers: Optional[int] = None,
+    ) -> Iterator[pathlib.Path]:
+        if not refresh and (repos := self.cached(max_age)) is not None:
+            yield from repos
+        else:
+            yield from self.refreshing(full=refresh, max_age=max_age, workers=workers)
+
+    def cached(self, max_age: float = 0) -> Optional[list[pathlib.Path]]:
+        meta = self._read(self.meta_path)
+        if meta is None or time.time() - meta["scanned"] > max_age:
+            return None
+        return [pathlib.Path(repo) for repo in meta["repos"]]
+
+    def refresh(
+        self,
+        *,
+        full: bool = False,
+        max_age: float = 0,
+        workers: Optional[int] = None,
+    ) -> list[pathlib.Path]:
+        return list(self.refreshing(full=full, max_age=max_age, workers=workers))
+
+    # yields repos as the walk finds them; the index is only written once the
+    # walk has run to completion, an abandoned generator leaves it untouched.
+    # the lock is only held to write, never while the consumer has the repos
+    def refreshing(
+        self,
+        *,
+        full: bool = False,
+        max_age: float = 0,
+        workers: Optional[int] = None,
+    ) -> Iterator[pathlib.Path]:
+        if not full and (repos := self.cached(max_age)) is not None:
+            yield from repos
+            return
+
+        scanned = time.time()
+        tree = None if full else self._read(self.tree_path)
+        previous = tree["dirs"] if tree else {}
+        dirs = {}
+        rescanned = []
+
+        def scan(path):
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                return path, False, []
+
+            # an unchanged mtime means no entries were added or removed,
+            # so the cached listing is still accurate for this directory
+            entry = previous.get(path)
+            if entry is None or entry[0] != mtime:
+                _, is_repo, subdirs = discovery.scan_directory(path, self.pruned)
+                entry = [mtime, is_repo, [os.path.basename(d) for d in subdirs]]
+                rescanned.append(path)
+
+            dirs[path] = entry
+            return path, entry[1], [os.path.join(path, name) for name in entry[2]]
+
+        def reused():
+            # directories that didn't change, straight from the tree and in
+            # this thread: a stat each costs far less than a trip through the
+            # pool. the ones that did change are left for the pool to walk
+            pending = [str(self.root)]
+            while pending:
+                path = pending.pop()
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+
+                entry = previous.get(path)
+                if entry is None or entry[0] != mtime:
+                    changed.append(path)
+                elif entry[1]:
+                    dirs[path] = entry
+                    yield pathlib.Path(path)
+                else:
+                    dirs[path] = entry
+                    pending.extend(os.path.join(path, name) for name in entry[2])
+
+        changed = []
+        repos = []
+        walks = itertools.chain(
+            reused(),
+            itertools.chain.from_iterable(
+                discovery.find_repo_roots(path, workers=workers, scan=scan)
+                for path in changed
+            ),
+        )
+        for repo in walks:
+            repos.append(str(repo))
+            yield repo
+
+        with self._locked():
+            # someone who started walking after us got there first
+            meta = self._read(self.meta_path)
+            if meta is not None and meta["scanned"] > scanned:
+                return
+
+            # the tree only changes if a directory did, or went missing
+            if rescanned or len(dirs) != len(previous):
+                write_json(self.tree_path, {"version": INDEX_VERSION, "dirs": dirs})
+            write_json(
+                self.meta_path,
+                {
+                    "version": INDEX_VERSION,
+                    "root": str(self.root),
+                    "scanned": scanned,
+                    "repos": sorted(repos),
+                },
+            )
+
+    def clear(self):
+        with self._locked():
+            for path in (self.meta_path, self.tree_path):
+                path.unlink(missing_ok=True)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read(path: pathlib.Path) -> Optional[dict]:
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return None
+        return data
+
+
+def test():
+    import shutil
+
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as cache:
+        root = pathlib.Path(root).resolve()
+        repo = lambda *parts: root.joinpath(*parts, ".git").mkdir(parents=True)
+        index = ProjectIndex(root, directory=cache)
+        found = lambda: sorted(p.relative_to(root).as_posix() for p in index.refresh())
+
+        repo("a")
+        repo("a", "nested")  # inside another repo
+        repo("group", "b")
+        repo("group", "node_modules", "dep")  # pruned
+        repo("node_modules", "dep")
+        assert found() == ["a", "group/b"], found()
+        assert index.cached(max_age=60) == [root / "a", root / "group" / "b"]
+
+        # incremental refreshes reuse the tree, but still see what changed
+        repo("group", "c")
+        repo("d", "deeper", "e")
+        assert found() == ["a", "d/deeper/e", "group/b", "group/c"], found()
+
+        shutil.rmtree(root / "group" / "b")
+        shutil.rmtree(root / "d")
+        assert found() == ["a", "group/c"], found()
+
+        # a repo turning up in a directory that was already scanned
+        (root / "group" / "c" / ".git").rmdir()
+        repo("group", "f")
+        (root / "plain").mkdir()
+        assert found() == ["a", "group/f"], found()
+        repo("plain")
+        assert found() == ["a", "group/f", "plain"], found()
+
+        # nothing changed, so the tree is left alone
+        tree = index.tree_path.stat().st_ino
+        assert found() == ["a", "group/f", "plain"], found()
+        assert index.tree_path.stat().st_ino == tree
+
+        # a consumer halfway through a walk doesn't hold up anyone else, and
+        # when it's done it doesn't clobber the newer index
+        slow = index.refreshing()
+        next(slow)
+        repo("late")
+        assert found() == ["a", "group/f", "late", "plain"], found()
+        newest = index._read(index.meta_path)
+        list(slow)
+        assert index._read(index.meta_path) == newest
+    print("ok")
+
+
+#  vim: set sw=4 ts=4 expandtab
@@ -4,11 +4,22 @@ import json
 import argparse
 import sys
 import pathlib
+import textwrap
+from typing import Iterator
 
+from git import InvalidGitRepositoryError
+
+from ..pythoning.fmt.templates import compile_template
 from .types import PortageSystemRepo, UnixRepo, GitRepo, Repo
+from . import discovery
+from .index import ProjectIndex
 
 repotypes = (GitRepo,)
 
+# the index is trusted as is for this long; --refresh or a lower --max-age
+# when a new repo has to show up right away
+MAX_AGE = 300.0
+
 
 def test_and_set_project(dir: pathlib.Path) -> None | Repo:
     for repotype in repotypes:
@@ -26,41 +37,104 @@ def find_projects_over(directory: pathlib.Path, root_directory) -> list[Repo]:
     return projects
 
 
-def find_projects_under(directory: pathlib.Path) -> list[Repo]:
-    projects = []
-    for dirpath, _, _ in os.walk(directory):
-        if repo := test_and_set_project(pathlib.Path(dirpath)):
-            projects.append(repo)
+def load_project(path: pathlib.Path) -> None | Repo:
+    # discovery already saw the .git entry, so skip the is_repo() probe
+    try:
+        return GitRepo(path)
+    except (InvalidGitRepositoryError, NotImplementedError):
+        return None
+
+
+def find_projects_under(directory: pathlib.Path, workers=None) -> Iterator[Repo]:
+    for path in discovery.find_repo_roots(directory, workers=workers):
+        if repo := load_project(path):
+            yield repo
 
-    return projects
 
+def find_projects_indexed(
+    directory: pathlib.Path, max_age=MAX_AGE, refresh=False, workers=None
+) -> Iterator[Repo]:
+    index = ProjectIndex(directory)
+    for path in index.stream(max_age=max_age, refresh=refresh, workers=workers):
+        if repo := load_project(path):
+            yield repo
 
-def list_projects(dir, args):
+
+def list_projects(dir, args) -> int:
     root_path = pathlib.Path("/" if args.system else os.getenv("HOME", "~"))
     cwd = pathlib.Path(dir)
 
     # over_paths = find_projects_over(cwd, root_path)
-    under_paths = find_projects_under(cwd)
-
-    projects = under_paths
+    if args.no_index:
+        under_paths = find_projects_under(cwd, workers=args.workers)
+    else:
+        under_paths = find_projects_indexed(
+            cwd, max_age=args.max_age, refresh=args.refresh, workers=args.workers
+        )
+
+    # compiling up front also rejects a bad --format before the walk starts
+    template = compile_template(args.format, GitRepo.specifier_keys)
+    projects = GitRepo.preloading(
+        under_paths,
+        dates=args.json or args.ndjson or "e" in template,
+        workers=args.workers,
+    )
 
+    # everything is printed as soon as it's found, so piping into fzf or jq
+    # starts producing output right away
+    count = 0
     if args.json:
-        print(json.dumps([proj.__json__() for proj in projects], indent=4))
+        # same output as one big json.dumps(..., indent=4), one item at a time
+        for proj in projects:
+            item = textwrap.indent(json.dumps(proj.__json__(), indent=4), " " * 4)
+            print("[" if count == 0 else ",", item, sep="\n", end="", flush=True)
+            count += 1
+        print("\n]" if count else "[]")
     else:
         for proj in projects:
-            print(proj)
+            if args.ndjson:
+                print(json.dumps(proj.__json__()), flush=True)
+            else:
+                print(f"{proj:{args.format}}", flush=True)
+            count += 1
 
-    return projects
+    return count
 
 
 def main(*args):
     parser = argparse.ArgumentParser(description="List projects on the system")
-    parser.add_argument(
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument(
         "-j", "--json", action="store_true", help="Output in JSON format"
     )
+    output.add_argument(
+        "--ndjson", action="store_true", help="Output one JSON object per line"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        default="%t:%n\t(%o)\t%p\t%e",
+        help="Output format: %%t type, %%n name, %%o owner, %%p path, %%e last edit",
+    )
     parser.add_argument(
         "--system", action="store_true", help="Include system directories"
     )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Threads used to scan directories"
+    )
+    parser.add_argument(
+        "--refresh", action="store_true", help="Rescan everything, ignoring the index"
+    )
+    parser.add_argument(
+        "--max-age",
+        type=float,
+        default=MAX_AGE,
+        help="Trust the index without re-checking if it's younger than this "
+        "(seconds, default %(default)g)",
+    )
+    parser.add_argument(
+        "--no-index", action="store_true", help="Neither read nor update the index"
+    )
     parser.add_argument("dirs", nargs="*", help="directory to start from")
     args = parser.parse_args()
     dirs = args.dirs if args.dirs else [os.curdir]
@@ -69,5 +143,12 @@ def main(*args):
         list_projects(dir, args)
 
 
+def test():
+    from . import gitmeta, index
+
+    gitmeta.test()
+    index.test()
+
+
 if __name__ == "__main__":
     main(sys.argv)
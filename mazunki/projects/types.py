@@ -5,9 +5,17 @@ from git import Repo as GitRepository, InvalidGitRepositoryError
 from gentoolkit.helpers import FileOwner as PortageFileOwner
 from gentoolkit.package import Package as PortagePackage
 
+import os
 import pathlib
 import typing
 import datetime
+import queue
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ..pythoning.fmt.templates import compile_template
+from . import gitmeta
 
 __all__ = ("GitRepo", "UnixRepo", "PortageSystemRepo", "Repo")
 type Repo = GitRepo | PortageSystemRepo | UnixRepo
@@ -39,30 +47,19 @@ class ABCRepo(abc.ABC):
     def __str__(self):
         return f"{self:%t:%n\t(%o)\t%p\t%e}"
 
+    # only evaluated when a format actually uses them, %e can be expensive
+    specifiers = {
+        "n": lambda self: self.name.removesuffix(".git"),
+        "p": lambda self: str(self.path).replace(str(self.path.home()), ""),
+        "t": lambda self: self.type_identifier,
+        "o": lambda self: self.owner,
+        "e": lambda self: self.last_modified_date(),
+    }
+    specifier_keys = frozenset(specifiers)
+
     def __format__(self, fmt):
-        specifiers = {
-            "n": self.name.removesuffix(".git"),
-            "p": str(self.path).replace(str(self.path.home()), ""),
-            "t": self.type_identifier,
-            "o": self.owner,
-            "e": self.last_modified_date(),
-        }
-        stringbuilder = []
-
-        i = 0
-        while i < len(fmt):
-            if fmt[i] == "%" and i < len(fmt) - 1:
-                i += 1
-                if fmt[i] in specifiers:
-                    stringbuilder.append(str(specifiers[fmt[i]]))
-                    i += 1
-                else:
-                    raise RuntimeError("Unexpected specifier")
-            else:
-                stringbuilder.append(fmt[i])
-                i += 1
-
-        return "".join(stringbuilder)
+        template = compile_template(fmt, self.specifier_keys)
+        return template.render(lambda key: self.specifiers[key](self))
 
     def __json__(self):
         return {
@@ -77,37 +74,127 @@ class ABCRepo(abc.ABC):
 class GitRepo(ABCRepo):
     type_identifier = "git"
 
+    # name, owner and the commit date are read lazily (and straight from
+    # .git where possible), so listing thousands of repos stays cheap.
+    # ABCRepo.__init__ isn't called since it would set name/owner eagerly
     def __init__(self, path: pathlib.Path):
-        self.gitrepo = GitRepository(str(path))
-        if self.gitrepo.bare:
-            raise NotImplementedError("we don't support bare git repos")
-
-        remotes = self.gitrepo.remotes
+        self.path = path if isinstance(path, pathlib.Path) else pathlib.Path(path)
+        self.git_dir, self.common_dir = gitmeta.git_dirs(self.path)
+        if not os.path.isfile(os.path.join(self.git_dir, "HEAD")):
+            if (self.path / "HEAD").is_file():
+                raise NotImplementedError("we don't support bare git repos")
+            raise InvalidGitRepositoryError(str(self.path))
+
+    @functools.cached_property
+    def gitrepo(self) -> GitRepository:
+        return GitRepository(str(self.path))
+
+    @functools.cached_property
+    def _identity(self) -> tuple[str, str]:
+        remotes = gitmeta.remote_urls(self.common_dir)
         if remotes:
-            repoowner, _, reponame = remotes[0].url.partition(":")[2].rpartition("/")
+            repoowner, _, reponame = remotes[0].partition(":")[2].rpartition("/")
             repoowner = repoowner.split("/")[-1]
         else:
-            reponame = path.name
-            repoowner = path.owner()
+            reponame = self.path.name
+            repoowner = self.path.owner()
 
-        config = self.gitrepo.config_reader()
         # owner = str(config.get_value("user", "name")) or repoowner
-        owner = repoowner
-
-        super().__init__(path, name=reponame, owner=owner)
+        return reponame, repoowner
+
+    @property
+    def name(self) -> str:
+        return self._identity[0]
+
+    @property
+    def owner(self) -> str:
+        return self._identity[1]
+
+    @functools.cached_property
+    def _committed_datetime(self) -> datetime.datetime:
+        sha = gitmeta.resolve_head(self.git_dir, self.common_dir)
+        if sha and (date := gitmeta.commit_date(self.common_dir, sha)):
+            return date
+        # deltified commits, alternates, unborn branches: let GitPython decide
+        return self.gitrepo.head.commit.committed_datetime
 
     @classmethod
     def is_repo(cls, path: pathlib.Path) -> bool:
-        try:
-            if path.name == ".git":
-                return False
-            GitRepository(str(path))
-            return True
-        except InvalidGitRepositoryError:
+        if path.name == ".git":
             return False
+        # a stat is enough here, the constructor does the real validation
+        return os.path.lexists(path / ".git")
 
     def last_modified_date(self) -> datetime.datetime:
-        return self.gitrepo.head.commit.committed_datetime
+        return self._committed_datetime
+
+    @classmethod
+    def preload(
+        cls, repos: typing.Iterable["GitRepo"], *, dates=True, workers=None
+    ) -> None:
+        for _ in cls.preloading(repos, dates=dates, workers=workers):
+            pass
+
+    @classmethod
+    def preloading(
+        cls,
+        repos: typing.Iterable["GitRepo"],
+        *,
+        dates=True,
+        workers=None,
+        window=256,
+    ) -> typing.Iterator["GitRepo"]:
+        # warms the per-repo caches on a thread pool and yields each repo, in
+        # order, as soon as it's ready. a feeder thread drains `repos`, so a
+        # slow upstream (discovery) never holds back repos already loaded.
+        # at most `window` loaded repos wait to be consumed. failures are
+        # left uncached, so they surface when that repo is actually used
+        def load(repo):
+            try:
+                repo._identity
+                if dates:
+                    repo._committed_datetime
+            except (ValueError, OSError):
+                pass
+            return repo
+
+        repos = iter(repos)
+        loaded = queue.SimpleQueue()
+        slots = threading.Semaphore(window)
+        stop = threading.Event()
+        end = object()
+        pool = ThreadPoolExecutor(max_workers=workers)
+
+        def feed():
+            try:
+                for repo in repos:
+                    slots.acquire()
+                    if stop.is_set():
+                        break
+                    loaded.put(pool.submit(load, repo))
+            except BaseException as e:
+                loaded.put(e)
+            finally:
+                loaded.put(end)
+                # from this thread, the only one ever iterating it, so that
+                # discovery gets to shut its own pool down
+                if close := getattr(repos, "close", None):
+                    close()
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        try:
+            while (future := loaded.get()) is not end:
+                if isinstance(future, BaseException):
+                    raise future
+                slots.release()
+                yield future.result()
+        finally:
+            # no joining: the feeder may be stuck waiting for upstream to
+            # find another repo, and it cleans up after itself once it does
+            stop.set()
+            slots.release()  # in case the feeder is waiting for room
+            pool.shutdown(wait=False, cancel_futures=True)
 
 
 class PortageSystemRepo(ABCRepo):
@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# pkg(mazunki)/pythoning/atomic.py
+import os
+import json
+import tempfile
+
+__all__ = ("write_json",)
+
+
+def write_json(path: str | os.PathLike, data) -> None:
+    # write-then-rename, so concurrent readers only ever see whole files.
+    # the temporary file sits next to the target so the rename can't cross
+    # filesystems
+    path = os.fspath(path)
+    directory, name = os.path.split(path)
+    os.makedirs(directory or ".", exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory or ".", prefix=name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+#  vim: set sw=4 ts=4 expandtab
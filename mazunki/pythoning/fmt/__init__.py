@@ -1,5 +1,9 @@
 #!/usr/bin/env python
 # pkg(mazunki)/pythoning/fmt/__init__.py
 
-from .printing import print
-from .clear import clear
+from .. import lazy
+
+__getattr__, __dir__ = lazy.exports(
+    __name__, {"print": ".printing:print", "clear": ".clear:clear"}
+)
+__all__ = ("print", "clear")
@@ -1,8 +1,12 @@
 #!/usr/bin/env python
-# pkg(mazunki)/pythoning/fmt/formatters.py
+# pkg(mazunki)/pythoning/fmt/expressions.py
 
-from typing import Optional, Iterable
+from typing import Any, Callable, Literal, Optional, Iterable
+import builtins
+import functools
+import io
 import itertools
+import sys
 
 from ..typed.expressions import Expression, Expressable
 
@@ -43,35 +47,87 @@ class DeclarationExpr(LhsRhsExpr):
         super().__init__(lhs, rhs, " := ")
 
 
-def cell(data, width=None, height=3):
-    width = width or len(str(data))
-    top = "⎡", " ", "⎤"
-    mid = "|", " ", "|"
-    bot = "⎣", " ", "⎦"
+_TOP = "⎡", " ", "⎤"
+_MID = "|", " ", "|"
+_BOT = "⎣", " ", "⎦"
+
+
+@functools.lru_cache(maxsize=256)
+def frame(width: int, height: int) -> tuple[tuple[str, ...], str, tuple[str, ...]]:
+    # the lines above the data, the data line as a format string, and the
+    # lines below, for any cell of this shape
+    data_line = f"{_MID[0]}{{:^{width}}}{_MID[2]}"
     if height <= 2:
-        return f"{mid[0]}{str(data):^{width}}{mid[1]}"
-    else:
-        top_line = f"{top[0]}{top[1]:^{width}}{top[2]}"
-        data_line = f"{mid[0]}{str(data):^{width}}{mid[2]}"
-        pad_line = f"{mid[0]}{mid[1]*width}{mid[2]}"
-        bot_line = f"{bot[0]}{bot[1]:^{width}}{bot[2]}"
-        padding = (height - 2) // 2
+        return (), data_line, ()
+
+    top_line = f"{_TOP[0]}{_TOP[1] * width}{_TOP[2]}"
+    pad_line = f"{_MID[0]}{_MID[1] * width}{_MID[2]}"
+    bot_line = f"{_BOT[0]}{_BOT[1] * width}{_BOT[2]}"
+    padding = (pad_line,) * ((height - 2) // 2)
+    return (top_line, *padding), data_line, (*padding, bot_line)
+
 
+def cell(data, width=None, height=3):
+    data = str(data)
+    above, data_line, below = frame(width or len(data), height)
+    return (*above, data_line.format(data), *below)
+
+
+@functools.lru_cache(maxsize=256)
+def _row_frame(
+    widths: tuple[int, ...], height: int, separator: str
+) -> tuple[str, str, str]:
+    # a whole row of cells side by side: everything but the data is fixed,
+    # and the data line takes one positional field per cell
+    frames = [frame(width, height) for width in widths]
+    lines = lambda parts: "".join(f"{separator.join(line)}\n" for line in zip(*parts))
+    data_line = (
+        separator.replace("{", "{{")
+        .replace("}", "}}")
+        .join(data_line for _, data_line, _ in frames)
+    )
     return (
-        top_line,
-        *([pad_line] * padding),
-        data_line,
-        *([pad_line] * padding),
-        bot_line,
+        lines(above for above, _, _ in frames),
+        f"{data_line}\n",
+        lines(below for _, _, below in frames),
     )
 
 
+def write_cells(
+    datas: Iterable,
+    write: Optional[Callable[[str], Any]] = None,
+    max=10,
+    width: Optional[int | Literal["auto"]] = None,
+    height=3,
+    separator=" ",
+):
+    # streams the grid to write() a row of cells at a time, holding on to
+    # nothing but that row. without a width every cell is as wide as its own
+    # data, like cell(). width="auto" makes every column as wide as its
+    # widest cell instead, which takes one pass over all of the data first
+    write = write or sys.stdout.write
+    rows = itertools.batched(map(str, datas), max)
+
+    if width == "auto":
+        rows = list(rows)
+        widths = [0] * max
+        for row in rows:
+            for column, data in enumerate(row):
+                widths[column] = builtins.max(widths[column], len(data))
+        widths = tuple(widths)
+    elif width:
+        widths = (width,) * max
+
+    for row in rows:
+        row_widths = widths[: len(row)] if width else tuple(map(len, row))
+        above, data_line, below = _row_frame(row_widths, height, separator)
+        write(f"{above}{data_line.format(*row)}{below}")
+
+
 def cells(datas: Iterable, max=10, *args, **kwargs):
-    cells = (cell(data, *args, **kwargs) for data in datas)
-    return "\n".join(
-        "\n".join([" ".join(line) for line in zip(*itemset)])
-        for itemset in itertools.batched(cells, max)
-    )
+    buffer = io.StringIO()
+    write_cells(datas, buffer.write, max, *args, **kwargs)
+    return buffer.getvalue().removesuffix("\n")
 
 
 #  vim: set sw=4 ts=4 expandtab
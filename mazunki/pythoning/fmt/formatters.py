@@ -1,38 +1,18 @@
 #!/usr/bin/env python
-
 import warnings
 
-
-class MalformedString(Warning): ...
+from .templates import compile_template, MalformedString
 
 
 class Formatter:
     def __init__(self, specifiers):
         self.specifiers = specifiers
+        self.keys = frozenset(specifiers)
 
     def format(self, string: str):
-        it = enumerate(string)
-        stringbuilder = []
-
-        for i, character in it:
-            if character == "%":
-                if i + 1 >= len(string):
-                    warnings.warn(
-                        f"{repr(string)} ends with an unfinished format specifier",
-                        MalformedString,
-                    )
-                    continue
-                if string[i + 1] in self.specifiers:
-                    stringbuilder.append(self.specifiers[string[i + 1]])
-                    next(it)
-            elif character == "{":
-                if string[i + 1] in self.specifiers:
-                    stringbuilder.append(self.specifiers[string[i + 1]])
-                    next(it)
-            else:
-                stringbuilder.append(character)
-
-        return "".join(map(str, stringbuilder))
+        # both %x and {x work; unknown specifiers lose their opener
+        template = compile_template(string, self.keys, openers="%{", strict=False)
+        return template.render(self.specifiers.__getitem__)
 
 
 def test():
@@ -43,8 +23,15 @@ def test():
         "f": 69,
     }
     text = "Hey! '%h' is a very '%x'. %f%"
-    f = Formatter(specifiers).format(text)
+    formatter = Formatter(specifiers)
+    f = formatter.format(text)
     print(f)
 
+    # compiled once, but every use of the malformed string still warns
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        assert formatter.format(text) == f
+    assert [w.category for w in caught] == [MalformedString], caught
+
 
 #  vim: set sw=4 ts=4 expandtab
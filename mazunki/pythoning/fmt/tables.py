@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# pkg(mazunki)/pythoning/fmt/tables.py
+
+from typing import Optional, TextIO
+import shutil
+import sys
+
+__all__ = ("TableWriter", "fit_columns")
+
+
+class TableWriter:
+    # gathers rendered text and hands it to a stream a chunk at a time, so a
+    # table of any length costs one write() per `chunk` characters and never
+    # more memory than that. text streams backed by a binary buffer (like a
+    # real stdout) get the encoded bytes directly, anything else (StringIO,
+    # captured output) gets the text
+    def __init__(self, stream: Optional[TextIO] = None, chunk: int = 1 << 16):
+        self.stream = stream
+        self.chunk = chunk
+        self._parts: list[str] = []
+        self._size = 0
+
+    def write(self, text: str):
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.chunk:
+            self.flush()
+
+    def flush(self):
+        if not self._parts:
+            return
+
+        # sys.stdout is looked up now, it may have been swapped out since
+        stream = self.stream or sys.stdout
+        text = "".join(self._parts)
+        self._parts = []
+        self._size = 0
+
+        buffer = getattr(stream, "buffer", None)
+        if buffer is None:
+            stream.write(text)
+            stream.flush()
+            return
+
+        # anything already written as text has to come out first
+        stream.flush()
+        buffer.write(
+            text.encode(
+                getattr(stream, "encoding", None) or "utf-8",
+                getattr(stream, "errors", None) or "strict",
+            )
+        )
+        buffer.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.flush()
+
+
+def fit_columns(width: int, separator: int = 1, fallback: int = 80) -> int:
+    # how many columns `width` characters wide fit side by side in the
+    # terminal, at least one
+    terminal = shutil.get_terminal_size((fallback, 24)).columns
+    return max(1, (terminal + separator) // (width + separator))
+
+
+#  vim: set sw=4 ts=4 expandtab
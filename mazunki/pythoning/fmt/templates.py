@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# pkg(mazunki)/pythoning/fmt/templates.py
+
+import functools
+import warnings
+from typing import Any, Callable, Optional
+
+__all__ = ("Template", "compile_template", "MalformedString", "UnexpectedSpecifier")
+
+
+class MalformedString(Warning): ...
+
+
+class UnexpectedSpecifier(RuntimeError):
+    def __init__(self, fmt, specifier):
+        super().__init__(f"Unexpected specifier %{specifier} in {repr(fmt)}")
+
+
+class Template:
+    # a parsed format string: (literal, specifier) pairs, where the specifier
+    # is None for trailing text. rendering only resolves the specifiers that
+    # actually appear in it. malformed if it ended with a lone opener
+    __slots__ = ("segments", "keys", "malformed")
+
+    def __init__(
+        self, segments: tuple[tuple[str, Optional[str]], ...], malformed: bool = False
+    ):
+        self.segments = segments
+        self.keys = frozenset(key for _, key in segments if key is not None)
+        self.malformed = malformed
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+
+    def render(self, resolve: Callable[[str], Any]) -> str:
+        parts = []
+        for literal, key in self.segments:
+            parts.append(literal)
+            if key is not None:
+                parts.append(str(resolve(key)))
+        return "".join(parts)
+
+    def as_format(self, fields: Optional[str | tuple[str, ...]] = None) -> str:
+        # the same template for str.format, for rendering lots of rows without
+        # a call per specifier. specifiers become field names, or positions
+        # when the order of the fields is given
+        escape = lambda text: text.replace("{", "{{").replace("}", "}}")
+        field = (lambda key: key) if fields is None else fields.index
+        return "".join(
+            escape(literal) + ("" if key is None else f"{{{field(key)}}}")
+            for literal, key in self.segments
+        )
+
+
+# strict: unknown specifiers raise, and a trailing opener is kept as text
+# lenient: unknown specifiers drop their opener, a trailing one warns
+def compile_template(
+    fmt: str, known: frozenset[str], openers: str = "%", strict: bool = True
+) -> Template:
+    template = _compile(fmt, known, openers, strict)
+    # every time, not just when it's first compiled
+    if template.malformed:
+        warnings.warn(
+            f"{repr(fmt)} ends with an unfinished format specifier",
+            MalformedString,
+            stacklevel=2,
+        )
+    return template
+
+
+@functools.lru_cache(maxsize=512)
+def _compile(fmt: str, known: frozenset[str], openers: str, strict: bool) -> Template:
+    segments = []
+    literal = []
+    malformed = False
+
+    i = 0
+    while i < len(fmt):
+        character = fmt[i]
+        if character not in openers:
+            literal.append(character)
+            i += 1
+        elif i + 1 >= len(fmt):
+            if strict:
+                literal.append(character)
+            else:
+                malformed = True
+            i += 1
+        elif fmt[i + 1] in known:
+            segments.append(("".join(literal), fmt[i + 1]))
+            literal = []
+            i += 2
+        elif strict:
+            raise UnexpectedSpecifier(fmt, fmt[i + 1])
+        else:
+            i += 1
+
+    if literal or not segments:
+        segments.append(("".join(literal), None))
+    return Template(tuple(segments), malformed)
+
+
+#  vim: set sw=4 ts=4 expandtab
@@ -0,0 +1,15 @@
+#!/usr/bin/env python
+# pkg(mazunki)/pythoning/fmt/units.py
+
+__all__ = ("human_bytes",)
+
+
+def human_bytes(value: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:
+            return f"{value:.0f}{unit}"
+        value /= 1024
+    return f"{value:.1f}GiB"
+
+
+#  vim: set sw=4 ts=4 expandtab
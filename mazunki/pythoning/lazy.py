@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# pkg(mazunki)/pythoning/lazy.py
+import importlib
+import sys
+
+__all__ = ("exports", "star")
+
+# every package's lazy exports, by package name
+_exports: dict[str, dict[str, str]] = {}
+
+
+def star(module: str, *names: str) -> dict[str, str]:
+    # what `from module import *` would export, for exports()
+    return {name: f"{module}:{name}" for name in names}
+
+
+def _rebind(module: str):
+    # importing a.b.c binds each submodule on its parent package, which
+    # hides an export of the same name: fmt.clear is the function from
+    # fmt/clear.py, not the module. put those exports back
+    parts = module.split(".")
+    for depth in range(1, len(parts)):
+        package, name = ".".join(parts[:depth]), parts[depth]
+        source, _, attribute = _exports.get(package, {}).get(name, "").partition(":")
+        if attribute and package in sys.modules:
+            value = getattr(importlib.import_module(source, package), attribute)
+            setattr(sys.modules[package], name, value)
+
+
+# no typing imports here: this is on the import path of everything
+def exports(package: str, names: dict[str, str]) -> tuple:
+    # a module-level __getattr__ and __dir__ that import each export on first
+    # access. names maps the export to "module" or "module:attribute",
+    # relative to the package. once loaded, an export is a plain global
+    _exports[package] = names
+
+    def __getattr__(name: str):
+        try:
+            target = names[name]
+        except KeyError:
+            raise AttributeError(
+                f"module {package!r} has no attribute {name!r}"
+            ) from None
+
+        module, _, attribute = target.partition(":")
+        value = importlib.import_module(module, package)
+        _rebind(value.__name__)
+        if attribute:
+            value = getattr(value, attribute)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(vars(sys.modules[package]).keys() | names.keys())
+
+    return __getattr__, __dir__
+
+
+def test():
+    import mazunki
+    import mazunki.pythoning.fmt as fmt
+
+    # going through mazunki first imports fmt/clear.py behind fmt's back
+    assert callable(mazunki.clear)
+    assert callable(fmt.clear), fmt.clear
+    assert fmt.clear is mazunki.clear
+    assert callable(fmt.print) and fmt.print is mazunki.pprint
+    print("ok")
+
+
+#  vim: set sw=4 ts=4 expandtab
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# pkg(mazunki)/pythoning/packaging/dependencies.py
+
+import re
+import sys
+import argparse
+import importlib.metadata
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from .library import Installed
+from ..fmt.units import human_bytes
+
+__all__ = ("Package", "Resolver", "canonical_name")
+
+_NAME = re.compile(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+try:
+    from packaging.requirements import Requirement, InvalidRequirement
+except ModuleNotFoundError:
+    Requirement = None
+
+
+def canonical_name(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _required_names(requires: Optional[Iterable[str]]) -> frozenset[str]:
+    # what a distribution needs here and now: extras aren't installed by
+    # default, and markers for other platforms don't apply. without
+    # `packaging` to evaluate markers, anything with a marker is skipped
+    names = set()
+    for line in requires or ():
+        if Requirement is not None:
+            try:
+                requirement = Requirement(line)
+            except InvalidRequirement:
+                continue
+            if requirement.marker is None or requirement.marker.evaluate({"extra": ""}):
+                names.add(canonical_name(requirement.name))
+        elif ";" not in line and (match := _NAME.match(line)):
+            names.add(canonical_name(match.group(1)))
+    return frozenset(names)
+
+
+@dataclass(frozen=True)
+class Package:
+    name: str  # canonical
+    version: str
+    requires: frozenset[str]
+    size: int  # bytes on disk, according to RECORD
+
+
+def _load(distribution: importlib.metadata.Distribution) -> Optional[Package]:
+    # reads metadata and stats whatever RECORD doesn't have a size for, so
+    # it's I/O bound and runs on the thread pool. None for broken installs,
+    # like a dist-info left without METADATA by an interrupted pip
+    name = distribution.metadata.get("Name")
+    if name is None:
+        return None
+
+    size = 0
+    for file in distribution.files or ():
+        if file.size is not None:
+            size += file.size
+            continue
+        try:
+            size += file.locate().stat().st_size
+        except OSError:
+            pass
+
+    return Package(
+        name=canonical_name(name),
+        version=distribution.version,
+        requires=_required_names(distribution.requires),
+        size=size,
+    )
+
+
+class Resolver:
+    # the requirement graph of every installed distribution, with transitive
+    # closures and their sizes worked out on demand and remembered
+    def __init__(
+        self,
+        distributions: Optional[Iterable[importlib.metadata.Distribution]] = None,
+        *,
+        workers: Optional[int] = None,
+    ):
+        if distributions is None:
+            distributions = importlib.metadata.distributions()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            packages = list(pool.map(_load, distributions))
+
+        # the first one found wins, like it does for imports
+        self.packages: dict[str, Package] = {}
+        for package in filter(None, packages):
+            self.packages.setdefault(package.name, package)
+
+        self._modules = {
+            module: [canonical_name(dist) for dist in dists]
+            for module, dists in importlib.metadata.packages_distributions().items()
+        }
+        self._closures: dict[str, frozenset[str]] = {}
+
+    def distributions_of(self, module: str) -> list[str]:
+        # the distributions providing a top-level module
+        return [dist for dist in self._modules.get(module, ()) if dist in self]
+
+    def __contains__(self, name: str) -> bool:
+        return canonical_name(name) in self.packages
+
+    def closure(self, name: str) -> frozenset[str]:
+        # the package and everything it pulls in, transitively. required
+        # packages that aren't installed are left out, see missing()
+        name = canonical_name(name)
+        if name in self._closures:
+            return self._closures[name]
+
+        seen = {name}
+        pending = [name]
+        while pending:
+            package = self.packages.get(pending.pop())
+            if package is None:
+                continue
+            for required in package.requires - seen:
+                if required in self._closures:
+                    seen |= self._closures[required]
+                elif required in self.packages:
+                    seen.add(required)
+                    pending.append(required)
+
+        closure = self._closures[name] = frozenset(seen & self.packages.keys())
+        return closure
+
+    def missing(self, name: str) -> frozenset[str]:
+        # required somewhere in the closure, but not installed
+        return frozenset(
+            required
+            for package in self.closure(name)
+            for required in self.packages[package].requires
+            if required not in self.packages
+        )
+
+    def size(self, *names: str) -> int:
+        # of everything these pull in, counting shared dependencies once
+        packages = frozenset().union(*map(self.closure, names))
+        return sum(self.packages[package].size for package in packages)
+
+    def modules(self, modules: Iterable[str]) -> dict[str, frozenset[str]]:
+        # what importing each of these top-level modules pulls in, as the
+        # union of the closures of every distribution that provides it
+        return {
+            module: frozenset().union(*map(self.closure, self.distributions_of(module)))
+            for module in modules
+        }
+
+
+def main(*args):
+    parser = argparse.ArgumentParser(
+        description="What installed modules pull in, and how big that is"
+    )
+    parser.add_argument(
+        "modules", nargs="*", help="Top-level modules (default: all installed)"
+    )
+    parser.add_argument("--workers", type=int, help="Threads reading RECORD files")
+    args = parser.parse_args(args)
+
+    resolver = Resolver(workers=args.workers)
+    modules = args.modules or sorted(module.name for module in Installed())
+
+    rows = []
+    for module, closure in resolver.modules(modules).items():
+        if closure:
+            size = resolver.size(*resolver.distributions_of(module))
+            rows.append((size, module, closure))
+
+    for size, module, closure in sorted(rows, key=lambda row: row[0], reverse=True):
+        print(f"{module:<30} {len(closure):>4} packages {human_bytes(size):>10}")
+        print(f"\t{', '.join(sorted(closure))}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
+
+
+#  vim: set sw=4 ts=4 expandtab
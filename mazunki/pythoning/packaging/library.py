@@ -2,56 +2,149 @@
 # pkg(mazunki)/pythoning/packaging/library.py
 
 import os
+import sys
+import json
+import hashlib
 import pkgutil
-from typing import Self, Iterable
+import functools
+from typing import Self, Iterable, Optional
 
 import abc
 
+from .. import xdg
+from ..atomic import write_json
+
 # from ..typed.errors import
 from ..typed.collections import OneOrMany, flatten
 
+INVENTORY_VERSION = 1
+
+# modules found right in here are the standard library's own
+_STDLIB = os.path.dirname(os.__file__)
+
 
 class Module:
+    # a top-level module and the sys.path entry it was found in. plain data,
+    # so a whole inventory can be cached; the finder is only looked up again
+    # when asked for
+    __slots__ = ("name", "path", "ispkg")
+
     def __init__(self, mod: pkgutil.ModuleInfo):
-        self.mod = mod
+        self.name = mod.name
+        self.path = getattr(mod.module_finder, "path", None)
+        self.ispkg = mod.ispkg
+
+    @classmethod
+    def at(cls, path: Optional[str], name: str, ispkg: bool) -> Self:
+        module = cls.__new__(cls)
+        module.name, module.path, module.ispkg = name, path, ispkg
+        return module
 
     def __format__(self, fmt) -> str:
         if fmt == "%p":
-            return str(self.mod.module_finder)
+            return str(self.paths)
         elif fmt == "%n":
-            return str(self.mod.name)
+            return str(self.name)
 
         return f"{self:%n}"
 
     def __str__(self):
         return f"{self}"
 
-    def _eq__(self, other: Self | str):
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.name!r}, {self.path!r})"
+
+    def __eq__(self, other: Self | str):
         if isinstance(other, str):
-            return self.mod.name == other
-        elif isinstance(other, Self):
-            return self.mod == other.mod
+            return self.name == other
+        elif isinstance(other, Module):
+            return (self.name, self.path) == (other.name, other.path)
         return False
 
     def __hash__(self) -> int:
-        return hash(self.mod)
+        return hash((self.name, self.path))
 
     @property
-    def name(self):
-        return self.mod.name
+    def mod(self) -> pkgutil.ModuleInfo:
+        return pkgutil.ModuleInfo(self.paths, self.name, self.ispkg)
 
     @property
     def paths(self):
-        return self.mod.module_finder
+        return pkgutil.get_importer(self.path) if self.path is not None else None
 
     @property
     def is_builtin(self):
-        path = self.mod.module_finder.path
-        return path == os.path.dirname(os.__file__)
+        return self.path == _STDLIB
 
     @property
     def is_special(self):
-        return self.mod.name.startswith("_")
+        return self.name.startswith("_")
+
+
+def inventory_path() -> str:
+    # one per interpreter and search path, so virtualenvs and interpreters
+    # sharing a cache directory don't keep invalidating each other's
+    key = json.dumps([sys.executable, sys.path]).encode()
+    digest = hashlib.sha1(key).hexdigest()[:16]
+    return os.path.join(xdg.cache_path("mazunki"), f"modules-{digest}.json")
+
+
+def _stamp(paths: Iterable[str]) -> list:
+    # what has to stay the same for a cached inventory to still be right:
+    # the entries of sys.path, in order, and when each of them last changed
+    stamps = []
+    for path in paths:
+        try:
+            stamps.append([path, os.stat(path or ".").st_mtime_ns])
+        except OSError:
+            stamps.append([path, None])
+    return stamps
+
+
+class Inventory:
+    # every top-level module on sys.path, found in a single pkgutil pass and
+    # cached on disk until sys.path or one of its directories changes
+    def __init__(self, modules: Iterable[Module]):
+        self.modules = frozenset(modules)
+        self.builtins = frozenset(mod for mod in self.modules if mod.is_builtin)
+        self.installed = self.modules - self.builtins
+
+    @classmethod
+    def scan(cls) -> Self:
+        return cls(Module(mod) for mod in pkgutil.iter_modules())
+
+    @classmethod
+    def cached(cls, path: Optional[str] = None) -> Self:
+        path = path or inventory_path()
+        stamp = _stamp(sys.path)
+
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("version") == INVENTORY_VERSION and data["stamp"] == stamp:
+                return cls(Module.at(*module) for module in data["modules"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        inventory = cls.scan()
+        try:
+            inventory._write(path, stamp)
+        except OSError:
+            pass  # a read-only cache just means scanning every time
+        return inventory
+
+    def _write(self, path: str, stamp: list):
+        data = {
+            "version": INVENTORY_VERSION,
+            "stamp": stamp,
+            "modules": [[mod.path, mod.name, mod.ispkg] for mod in self.modules],
+        }
+        write_json(path, data)
+
+
+@functools.cache
+def inventory() -> Inventory:
+    return Inventory.cached()
 
 
 class LibrarySet(abc.ABC):
@@ -63,8 +156,28 @@ class LibrarySet(abc.ABC):
     def __iter__(self) -> Iterable[Module]:
         yield from self.libs
 
-    def __neg__(self, other: Self):
-        return self.__class__(set(mod for mod in self.libs - other.libs))
+    def __len__(self):
+        return len(self.libs)
+
+    def __contains__(self, module: Module | str):
+        if isinstance(module, str):
+            return any(mod.name == module for mod in self.libs)
+        return module in self.libs
+
+    # set operations only ever combine what's already known, no rescans
+
+    def __neg__(self) -> "LibrarySet":
+        # every other module there is
+        return LibrarySet(inventory().modules - self.libs)
+
+    def __sub__(self, other: Self) -> "LibrarySet":
+        return LibrarySet(self.libs - other.libs)
+
+    def __or__(self, other: Self) -> "LibrarySet":
+        return LibrarySet(self.libs | other.libs)
+
+    def __and__(self, other: Self) -> "LibrarySet":
+        return LibrarySet(self.libs & other.libs)
 
     def __str__(self):
         return f"({", ".join(map(str, self.libs))})"
@@ -72,31 +185,39 @@ class LibrarySet(abc.ABC):
 
 class AllModules(LibrarySet):
     def __init__(self):
-        super().__init__(*(Module(mod) for mod in pkgutil.iter_modules()))
+        super().__init__(inventory().modules)
 
 
 class Builtins(LibrarySet):
     def __init__(self):
-        libs = (Module(lib) for lib in pkgutil.iter_modules())
-        libs = (lib for lib in libs if lib.is_builtin)
-        super().__init__(set(libs))
+        super().__init__(inventory().builtins)
 
 
 class Installed(LibrarySet):
     def __init__(self):
-        libs = (Module(lib) for lib in pkgutil.iter_modules())
-        libs = (lib for lib in libs if not lib.is_builtin)
-        super().__init__(set(libs))
+        super().__init__(inventory().installed)
+
+
+# each of these scans all of sys.path, so they're only worked out when used
+_inventories = {"all_libs": AllModules, "builtins": Builtins, "installed": Installed}
+
+
+def __getattr__(name):
+    try:
+        inventory = _inventories[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = globals()[name] = inventory()
+    return value
 
 
-all_libs = AllModules()
-# print(all_libs)
+def main():
+    print("Built-in packages:", __getattr__("builtins"))
+    print("Installed-packages:", __getattr__("installed"))
 
-builtins = Builtins()
-print("Built-in packages:", builtins)
 
-installed = Installed()
-print("Installed-packages:", installed)
+if __name__ == "__main__":
+    main()
 
 
 #  vim: set sts=4 sw=4 ts=4 expandtab
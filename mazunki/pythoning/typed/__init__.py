@@ -1,10 +1,29 @@
 #!/usr/bin/env python
 # pkg(mazunki)/pythoning/typed/__init__.py
 
-from .errors import *
-from .casting import *
+from .. import lazy
 
-from .collections import *
-from .static import *
+_exports = {
+    **lazy.star(".errors", "NoReturnType", "NoSupportedCasting", "UnexpectedData"),
+    **lazy.star(".casting", "As", "Cast"),
+    **lazy.star(".collections", "OneOrMany", "flatten"),
+    **lazy.star(".validation", "Sampling", "Validator", "validator", "is_valid"),
+    **lazy.star(
+        ".static",
+        "StaticTypeError",
+        "TypeConstraintError",
+        "ParameterPlan",
+        "parameter_plan",
+        "assert_type",
+        "check_arguments",
+        "check_keyword_arguments",
+        "check_return",
+        "typechecked",
+        "check_constraint",
+        "constrained",
+    ),
+}
+__getattr__, __dir__ = lazy.exports(__name__, _exports)
+__all__ = tuple(_exports)
 
 #  vim: set sw=4 ts=4 expandtab
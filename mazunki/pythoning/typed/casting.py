@@ -2,6 +2,7 @@
 # pkg(mazunki)/pythoning/typed/casting.py
 import inspect
 import functools
+from typing import Callable, Optional
 from .errors import NoSupportedCasting, NoReturnType
 
 __all__ = ("As", "Cast")
@@ -10,6 +11,8 @@ __all__ = ("As", "Cast")
 class _Cast:
     def __init__(self):
         self._casts = {}
+        # (concrete class, target) -> cast found along its mro, or None
+        self._resolved: dict[tuple[type, type], Optional[Callable]] = {}
 
     def cast(self, func):
         return_type = inspect.signature(func).return_annotation
@@ -25,32 +28,52 @@ class _Cast:
 
     def _remember(self, func, target_type: type):
         self._casts[(func.__qualname__.rsplit(".", 1)[0], target_type)] = func
+        self._resolved.clear()
 
+    def lookup(self, cls: type, target: type) -> Optional[Callable]:
+        try:
+            return self._resolved[(cls, target)]
+        except KeyError:
+            pass
 
-Cast = _Cast()
+        # casts defined on a base class apply to its subclasses too
+        found = None
+        for base in cls.__mro__:
+            if (key := (base.__qualname__, target)) in self._casts:
+                found = self._casts[key]
+                break
+
+        self._resolved[(cls, target)] = found
+        return found
 
 
-def get_caller_generics():
-    # this is actually cursed :)
-    stack = frame = None
-    try:
-        stack = inspect.stack()
-        frame = stack[2].frame.f_locals
-        return frame["self"].__args__
+Cast = _Cast()
+
 
-    finally:
-        del stack
-        del frame
+@functools.cache
+def _specialize(cls: type, target: type) -> type:
+    name = getattr(target, "__name__", repr(target))
+    return type(f"{cls.__name__}[{name}]", (cls,), {"_target": target})
 
 
 class As[T]:
+    # As[int] is a real subclass remembering its target, made once per type,
+    # so casting never has to go digging through the caller's frames
+    _target: Optional[type] = None
+
+    def __class_getitem__(cls, target: type) -> type["As"]:
+        return _specialize(cls, target)
+
     def __new__(cls, obj) -> T:
-        T = get_caller_generics()[0]
-        key = (obj.__class__.__qualname__, T)
-        if key in Cast._casts:
-            return Cast._casts[key](obj)
+        if cls._target is None:
+            raise TypeError(
+                f"{cls.__name__} needs a target type: {cls.__name__}[T](obj)"
+            )
+
+        if cast := Cast.lookup(type(obj), cls._target):
+            return cast(obj)
 
-        raise NoSupportedCasting(obj, T)
+        raise NoSupportedCasting(obj, cls._target)
 
 
 #  vim: set sw=4 ts=4 expandtab
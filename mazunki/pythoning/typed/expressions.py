@@ -1,8 +1,8 @@
 #!/usr/bin/env python
 # pkg(mazunki)/pythoning/typed/expressions.py
 
-from typing import Any, Protocol
-import ast, inspect, dis
+from typing import Any, Optional, Protocol
+import ast, dis, functools, itertools, os, sys, types
 
 
 class IllegalIteration(RuntimeError):
@@ -45,41 +45,81 @@ class Expression:
         return str(self.text)
 
 
-class LineVisitor(ast.NodeVisitor):
-    def __init__(self, pos):
-        self.pos = pos
-        self.nodes = []
+type Position = tuple[int, int, int, int]
 
-    def visit(self, node):
-        if self.has_pos(node) and self.get_position(node) == self.pos:
-            self.nodes.append(node)
-        self.generic_visit(node)
 
-    def has_pos(self, node):
+class Parser:
+    # parses once and indexes every node by its source position, and every
+    # node's parent, so both lookups below are a dict access
+    def __init__(self, source_code: str):
+        self.tree = ast.parse(source_code)
+        self.nodes: dict[Position, list[ast.AST]] = {}
+        self.parents: dict[ast.AST, ast.AST] = {}
+
+        for parent in ast.walk(self.tree):
+            if self.has_pos(parent):
+                self.nodes.setdefault(self.get_position(parent), []).append(parent)
+            for child in ast.iter_child_nodes(parent):
+                self.parents[child] = parent
+
+    @staticmethod
+    def has_pos(node):
         return all(
-            hasattr(node, attr)
+            getattr(node, attr, None) is not None
             for attr in ("lineno", "col_offset", "end_lineno", "end_col_offset")
         )
 
-    def get_position(self, node):
+    @staticmethod
+    def get_position(node) -> Position:
         return node.lineno, node.end_lineno, node.col_offset, node.end_col_offset
 
+    def find_nodes_at_line(self, pos: dis.Positions):
+        return self.nodes.get(tuple(pos), [])
 
-class Parser:
-    def __init__(self, source_code: str):
-        self.tree = ast.parse(source_code)
+    def find_parent(self, node):
+        return self.parents.get(node)
 
-    def find_nodes_at_line(self, pos: dis.Positions):
-        visitor = LineVisitor(pos)
-        visitor.visit(self.tree)
 
-        return visitor.nodes
+# filename -> (mtime, parser); None when the file can't be read or parsed
+_parsers: dict[str, tuple[int, Optional[Parser]]] = {}
 
-    def find_parent(self, node):
-        for parent in ast.walk(self.tree):
-            for child in ast.iter_child_nodes(parent):
-                if child is node:
-                    return parent
+
+def parser_for(filename: str) -> Optional[Parser]:
+    try:
+        mtime = os.stat(filename).st_mtime_ns
+    except OSError:
+        return None
+
+    cached = _parsers.get(filename)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        with open(filename, "r") as file:
+            parser = Parser(file.read())
+    except (OSError, SyntaxError, UnicodeDecodeError, ValueError):
+        parser = None
+
+    _parsers[filename] = (mtime, parser)
+    return parser
+
+
+def frame_position(frame: types.FrameType) -> Optional[dis.Positions]:
+    if frame.f_lasti < 0:
+        return None
+    return _code_position(frame.f_code, frame.f_lasti)
+
+
+@functools.lru_cache(maxsize=4096)
+def _code_position(code: types.CodeType, lasti: int) -> Optional[dis.Positions]:
+    # what inspect.getframeinfo() does, minus reading the source context
+    positions = code.co_positions()
+    lineno, end_lineno, col, end_col = next(
+        itertools.islice(positions, lasti // 2, None), (None,) * 4
+    )
+    if None in (lineno, end_lineno, col, end_col):
+        return None
+    return dis.Positions(lineno, end_lineno, col, end_col)
 
 
 class LiteralExpression(Expression):
@@ -93,33 +133,41 @@ class LiteralExpression(Expression):
         return self._literal_text
 
     def _check_illegal_stack(self):
-        stack = inspect.stack()
         restricted_functions = {"__iter__", "__getitem__", "__contains__"}
-        for idx, frame_info in enumerate(stack):
-            if frame_info.function in restricted_functions:
-                return frame_info.function
-
-            if frame_info.function == "__str__":
-                for sub_frame in stack[idx + 1 :]:
-                    if not sub_frame.code_context:
-                        continue
-
-                    if self._is_illegal_usage(sub_frame):
-                        return sub_frame.function
+        callers_checked = False
+        frame = sys._getframe(1)
+        try:
+            while frame is not None:
+                function = frame.f_code.co_name
+                if function in restricted_functions:
+                    return function
+
+                # every caller of the first __str__ is a caller of the later
+                # ones too, so there's no point in going through them twice
+                if function == "__str__" and not callers_checked:
+                    callers_checked = True
+                    caller = frame.f_back
+                    while caller is not None:
+                        if self._is_illegal_usage(caller):
+                            return caller.f_code.co_name
+                        caller = caller.f_back
+
+                frame = frame.f_back
+        finally:
+            del frame
+            caller = None
 
     @staticmethod
-    def _is_illegal_usage(frame_info: inspect.FrameInfo) -> bool:
-        filename = frame_info.filename
-        pos = frame_info.positions
+    def _is_illegal_usage(frame: types.FrameType) -> bool:
+        pos = frame_position(frame)
         if not pos:
             return False
 
-        with open(filename, "r") as file:
-            lines = file.read()
+        parser = parser_for(frame.f_code.co_filename)
+        if parser is None:
+            return False
 
-        parser = Parser(lines)
-        nodes = parser.find_nodes_at_line(pos)
-        for node in nodes:
+        for node in parser.find_nodes_at_line(pos):
             parent = parser.find_parent(node)
             if isinstance(parent, ast.For):
                 return True
@@ -153,11 +201,13 @@ def test_container(expr):
     _ = "a" in expr
 
 
-for test in test_loop_allocation, test_iteration, test_indexing, test_container:
-    try:
-        expr = LiteralExpression("hello")
-        test(expr)
-    except IllegalIteration as e:
-        print(e)
+def test():
+    for case in test_loop_allocation, test_iteration, test_indexing, test_container:
+        try:
+            expr = LiteralExpression("hello")
+            case(expr)
+        except IllegalIteration as e:
+            print(e)
+
 
 #  vim: set sw=4 ts=4 expandtab
@@ -1,8 +1,17 @@
 #!/usr/bin/env python
 # pkg(mazunki)/typed/static.py
 
-from typing import Callable, Any
+from typing import Callable, Any, Optional
 import functools
+import inspect
+import os
+
+from .validation import validator, Validator
+
+# decided when decorating: under `python -O` or with MAZUNKI_TYPECHECK=0 the
+# decorators hand back the undecorated function, so checks cost nothing.
+# flip it before the decorated modules get imported
+enabled = __debug__ and os.getenv("MAZUNKI_TYPECHECK", "1") != "0"
 
 
 class StaticTypeError(Exception):
@@ -18,40 +27,130 @@ class TypeConstraintError(Exception):
         super().__init__(message)
 
 
+type Check = Optional[tuple[str, Any, Validator]]
+
+
+def _check(name: str, annotation: Any) -> Check:
+    return None if annotation is None else (name, annotation, validator(annotation))
+
+
+def _run_check(value: Any, check: Check):
+    if check is not None and not check[2](value):
+        raise StaticTypeError(value, check[:2])
+
+
+class ParameterPlan:
+    # everything typechecked/constrained need to know about a signature,
+    # worked out once per function instead of on every call, including the
+    # compiled validator for each annotation
+    __slots__ = (
+        "positional",
+        "checked_positional",
+        "keyword",
+        "varargs",
+        "varkw",
+        "returns",
+    )
+
+    def __init__(self, func: Callable):
+        signature = inspect.signature(func)
+        expected = lambda annotation: (
+            None if annotation is inspect.Parameter.empty else annotation
+        )
+
+        self.keyword: dict[str, Check] = {}
+        self.varargs: Check = None
+        self.varkw: Check = None
+        self.returns: Check = _check("return", expected(signature.return_annotation))
+
+        positional = []
+        for name, param in signature.parameters.items():
+            annotation = expected(param.annotation)
+            if param.kind is param.VAR_POSITIONAL:
+                self.varargs = _check("*args", annotation)
+            elif param.kind is param.VAR_KEYWORD:
+                self.varkw = _check("**kwargs", annotation)
+            else:
+                if param.kind is not param.KEYWORD_ONLY:
+                    positional.append((name, annotation))
+                if param.kind is not param.POSITIONAL_ONLY:
+                    self.keyword[name] = _check(name, annotation)
+
+        self.positional: tuple[str, ...] = tuple(name for name, _ in positional)
+        self.checked_positional: tuple[tuple[int, Check], ...] = tuple(
+            (pos, _check(name, annotation))
+            for pos, (name, annotation) in enumerate(positional)
+            if annotation is not None
+        )
+
+    def position(self, name: str) -> Optional[int]:
+        try:
+            return self.positional.index(name)
+        except ValueError:
+            return None
+
+    def check_arguments(self, args: tuple):
+        for pos, check in self.checked_positional:
+            if pos >= len(args):
+                break
+            _run_check(args[pos], check)
+
+        if self.varargs is not None:
+            for arg in args[len(self.positional) :]:
+                _run_check(arg, self.varargs)
+
+    def check_keyword_arguments(self, kwargs: dict):
+        for name, kwarg in kwargs.items():
+            check = self.keyword.get(name, self.varkw)
+            if check is not None and check[0] != name:
+                check = (name, *check[1:])  # report **kwargs by the actual name
+            _run_check(kwarg, check)
+
+    def check_return(self, value: Any):
+        _run_check(value, self.returns)
+
+
+@functools.cache
+def parameter_plan(func: Callable) -> ParameterPlan:
+    return ParameterPlan(func)
+
+
+# isinstance() for annotations too: generics, unions, aliases and protocols
+# all go through a validator that's compiled once per annotation
 def assert_type(value: Any, annotation: tuple[str, type]):
     _, expected_type = annotation
     if expected_type is None:
         return
-    if not isinstance(value, expected_type):
+    if not validator(expected_type)(value):
         raise StaticTypeError(value, annotation)
 
 
 def check_arguments(func: Callable, *args):
-    for pos, arg in enumerate(args):
-        param_name = list(func.__annotations__)[pos]
-        annotation = param_name, func.__annotations__[param_name]
-
-        assert_type(arg, annotation)
+    parameter_plan(func).check_arguments(args)
 
 
 def check_keyword_arguments(func: Callable, **kwargs):
-    for name, kwarg in kwargs.items():
-        annotation = name, func.__annotations__[name]
-        assert_type(kwarg, annotation)
+    parameter_plan(func).check_keyword_arguments(kwargs)
 
 
-def check_return(func: Callable, value: type):
-    var_type = func.__annotations__.get("return", None)
-    assert_type(value, ("return", var_type))
+def check_return(func: Callable, value: Any):
+    parameter_plan(func).check_return(value)
 
 
 def typechecked(func):
+    if not enabled:
+        return func
+
+    plan = parameter_plan(func)
+
+    @functools.wraps(func)
     def _typechecker(*args, **kwargs):
-        check_arguments(func, *args)
-        check_keyword_arguments(func, **kwargs)
+        plan.check_arguments(args)
+        if kwargs:
+            plan.check_keyword_arguments(kwargs)
 
         result = func(*args, **kwargs)
-        check_return(func, type(result))
+        plan.check_return(result)
         return result
 
     return _typechecker
@@ -65,19 +164,21 @@ def check_constraint(value, callback, name, *args, **kwargs):
 @typechecked
 def constrained(param_name: str, callback: Callable, *cb_args, **cb_kwargs):
     def _wrapper(func: Callable):
+        if not enabled:
+            return func
+
+        position = parameter_plan(func).position(param_name)
+
         @functools.wraps(func)
         def _constrainer(*args, **kwargs):
             if param_name in kwargs:
                 check_constraint(
                     kwargs[param_name], callback, param_name, *cb_args, **cb_kwargs
                 )
-            else:
-                for pos, arg in enumerate(args):
-                    if param_name == list(func.__annotations__)[pos]:
-                        check_constraint(
-                            arg, callback, param_name, *cb_args, **cb_kwargs
-                        )
-                        break
+            elif position is not None and position < len(args):
+                check_constraint(
+                    args[position], callback, param_name, *cb_args, **cb_kwargs
+                )
             return func(*args, **kwargs)
 
         return _constrainer
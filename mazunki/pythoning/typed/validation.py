@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# pkg(mazunki)/pythoning/typed/validation.py
+
+from typing import Any, Callable, Literal, TypeAliasType, TypeVar
+from dataclasses import dataclass
+import collections.abc
+import functools
+import itertools
+import random
+import types
+import typing
+
+__all__ = ("Sampling", "Validator", "validator", "is_valid")
+
+type Validator = Callable[[Any], bool]
+
+
+@dataclass(frozen=True)
+class Sampling:
+    # containers up to `limit` elements are always checked in full. past
+    # that, "edges" checks the first and last limit/2, "random" checks
+    # `limit` random elements and "all" gives up on sampling altogether
+    limit: int = 64
+    mode: Literal["edges", "random", "all"] = "edges"
+
+
+# read on every check, so assigning a new Sampling takes effect right away
+sampling = Sampling()
+_rng = random.Random()
+
+
+def _sample(container) -> typing.Iterable:
+    config = sampling
+    if config.mode == "all" or len(container) <= config.limit:
+        return container
+    if not isinstance(container, collections.abc.Sequence):
+        # no cheap random access: settle for the first `limit` elements
+        return itertools.islice(container, config.limit)
+
+    size = len(container)
+    if config.mode == "random":
+        indices = _rng.sample(range(size), config.limit)
+    else:
+        half = config.limit // 2
+        indices = itertools.chain(range(half), range(size - half, size))
+    return (container[i] for i in indices)
+
+
+def _accept(_):
+    return True
+
+
+# bookkeeping that typing/abc/the compiler put on protocol classes
+_NOT_MEMBERS = frozenset(
+    {
+        "__module__",
+        "__qualname__",
+        "__doc__",
+        "__dict__",
+        "__weakref__",
+        "__init__",
+        "__annotations__",
+        "__parameters__",
+        "__orig_bases__",
+        "__type_params__",
+        "__static_attributes__",
+        "__firstlineno__",
+        "__protocol_attrs__",
+        "__non_callable_proto_members__",
+        "__subclasshook__",
+        "__abstractmethods__",
+        "__callable_proto_members_only__",
+        "_is_protocol",
+        "_is_runtime_protocol",
+    }
+)
+
+
+def _protocol_members(protocol: type) -> frozenset[str]:
+    if (known := getattr(protocol, "__protocol_attrs__", None)) is not None:
+        return frozenset(known)
+
+    members = set()
+    for base in protocol.__mro__:
+        if base in (typing.Protocol, typing.Generic, object):
+            continue
+        members.update(getattr(base, "__annotations__", {}))
+        members.update(
+            name
+            for name in vars(base)
+            if name not in _NOT_MEMBERS and not name.startswith("_abc_")
+        )
+    return frozenset(members)
+
+
+def _instance_of(cls: type) -> Validator:
+    if getattr(cls, "_is_protocol", False) and not getattr(
+        cls, "_is_runtime_protocol", False
+    ):
+        # isinstance() refuses non-runtime protocols, so check the shape
+        members = _protocol_members(cls)
+        return lambda value: all(hasattr(value, name) for name in members)
+
+    return lambda value: isinstance(value, cls)
+
+
+def _substitute(alias: TypeAliasType, args: tuple) -> Any:
+    try:
+        return alias.__value__[args]
+    except TypeError:
+        return alias.__value__
+
+
+def _compile(annotation) -> Validator:
+    if annotation is Any or annotation is object:
+        return _accept
+    if annotation is None or annotation is types.NoneType:
+        return lambda value: value is None
+    if isinstance(annotation, str):
+        return _accept  # unresolved forward reference, nothing to go on
+    if isinstance(annotation, TypeAliasType):
+        # resolved on first use, which also keeps recursive aliases finite
+        return lambda value: validator(annotation.__value__)(value)
+    if isinstance(annotation, TypeVar):
+        if annotation.__bound__ is not None:
+            return validator(annotation.__bound__)
+        if annotation.__constraints__:
+            return validator(typing.Union[annotation.__constraints__])
+        return _accept
+
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin is None:
+        if isinstance(annotation, type):
+            return _instance_of(annotation)
+        return _accept
+
+    if isinstance(origin, TypeAliasType):
+        return validator(_substitute(origin, args))
+    if origin is typing.Union or origin is types.UnionType:
+        options = tuple(validator(arg) for arg in args)
+        return lambda value: any(option(value) for option in options)
+    if origin is Literal:
+        return lambda value: any(
+            value == arg and type(value) is type(arg) for arg in args
+        )
+    if origin in (typing.Annotated, typing.ClassVar, typing.Final):
+        return validator(args[0])
+    if origin is type:
+        target = args[0] if args else object
+        return lambda value: isinstance(value, type) and (
+            target is Any or issubclass(value, target)
+        )
+    if origin is collections.abc.Callable:
+        return callable
+
+    if origin is tuple:
+        if not args:  # tuple[()]
+            return lambda value: value == ()
+        if len(args) == 2 and args[1] is Ellipsis:
+            item = validator(args[0])
+            return lambda value: isinstance(value, tuple) and all(
+                map(item, _sample(value))
+            )
+        items = tuple(validator(arg) for arg in args)
+        return lambda value: (
+            isinstance(value, tuple)
+            and len(value) == len(items)
+            and all(check(element) for check, element in zip(items, value))
+        )
+
+    is_origin = _instance_of(origin)
+    if not args:
+        return is_origin
+
+    if isinstance(origin, type) and issubclass(origin, collections.abc.Mapping):
+        if len(args) == 1:  # Counter[str] only says what the keys are
+            key = validator(args[0])
+            return lambda value: is_origin(value) and all(
+                map(key, _sample(value.keys()))
+            )
+        if len(args) != 2:
+            return is_origin
+        key, val = (validator(arg) for arg in args)
+        return lambda value: is_origin(value) and all(
+            key(k) and val(value[k]) for k in _sample(value.keys())
+        )
+
+    if isinstance(origin, type) and issubclass(origin, collections.abc.Iterable):
+        item = validator(args[0])
+
+        def _iterable(value):
+            if not is_origin(value):
+                return False
+            if not isinstance(value, collections.abc.Collection):
+                return True  # iterating would consume it
+            return all(map(item, _sample(value)))
+
+        return _iterable
+
+    return is_origin
+
+
+def validator(annotation) -> Validator:
+    try:
+        return _cached_validator(annotation)
+    except TypeError:  # unhashable annotation
+        return _compile(annotation)
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_validator(annotation) -> Validator:
+    return _compile(annotation)
+
+
+def is_valid(value: Any, annotation) -> bool:
+    return validator(annotation)(value)
+
+
+def test():
+    global sampling
+    from .collections import OneOrMany
+
+    # parametrized containers
+    assert is_valid([1, 2, 3], list[int])
+    assert not is_valid([1, "2", 3], list[int])
+    assert not is_valid((1, 2), list[int])
+    assert is_valid({"a": 1}, dict[str, int])
+    assert not is_valid({"a": "1"}, dict[str, int])
+    assert not is_valid({1: 1}, collections.abc.Mapping[str, int])
+    assert is_valid({1, 2}, set[int]) and not is_valid({1, None}, set[int])
+    assert is_valid((1, "a"), tuple[int, str])
+    assert not is_valid((1, "a", 2), tuple[int, str])
+    assert is_valid((1, 2, 3), tuple[int, ...])
+    assert not is_valid((1, 2, "3"), tuple[int, ...])
+    assert is_valid(iter("abc"), collections.abc.Iterator[int])  # not consumed
+    assert is_valid([[1], [2, 3]], list[list[int]])
+    assert not is_valid([[1], ["2"]], list[list[int]])
+
+    # one type argument is about the keys, the counts go unchecked
+    assert is_valid(collections.Counter("abc"), collections.Counter[str])
+    assert is_valid(collections.Counter("abc"), typing.Counter[str])
+    assert not is_valid(collections.Counter([1]), collections.Counter[str])
+    assert not is_valid({"a": 1}, collections.Counter[str])
+
+    # unions, optionals and literals
+    assert is_valid(1, int | str) and is_valid("1", int | str)
+    assert not is_valid(1.0, int | str)
+    assert is_valid(None, typing.Optional[int]) and not is_valid("", int | None)
+    assert is_valid("a", Literal["a", 1]) and not is_valid(True, Literal[1])
+
+    # type aliases, generic ones included
+    type Ids = list[int]
+    type Tree = int | list[Tree]
+    assert is_valid([1, 2], Ids) and not is_valid(["1"], Ids)
+    assert is_valid([1, [2, [3]]], Tree) and not is_valid([1, ["2"]], Tree)
+    assert is_valid(1, OneOrMany[int]) and is_valid([1, 2], OneOrMany[int])
+    assert not is_valid(["1"], OneOrMany[int])
+    assert not is_valid("1", OneOrMany[int])
+
+    # protocols without @runtime_checkable are checked by their shape
+    class Named(typing.Protocol):
+        name: str
+
+        def rename(self, name: str) -> None: ...
+
+    class Thing:
+        name = "thing"
+
+        def rename(self, name):
+            self.name = name
+
+    assert is_valid(Thing(), Named)
+    assert not is_valid(object(), Named)
+    assert not is_valid(types.SimpleNamespace(name="x"), Named)
+
+    # big containers only get a sample checked: the edges, or random picks
+    middle_is_wrong = [1] * 10 + ["x"] * 180 + [1] * 10
+    previous = sampling
+    try:
+        sampling = Sampling(limit=20, mode="edges")
+        assert is_valid(middle_is_wrong, list[int])
+        assert not is_valid(middle_is_wrong + ["x"], list[int])
+        sampling = Sampling(limit=20, mode="random")
+        assert not is_valid(middle_is_wrong, list[int])
+        assert is_valid([1] * 200, list[int])
+        sampling = Sampling(limit=20, mode="all")
+        assert not is_valid([1] * 199 + ["x"], list[int])
+        assert not is_valid(set(middle_is_wrong) | set(range(30)), set[int])
+    finally:
+        sampling = previous
+    print("ok")
+
+
+#  vim: set sw=4 ts=4 expandtab